@@ -3,72 +3,101 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
-import random
+import numpy as np
+from telemetry import Telemetry
 
 angle = 0.0
 bg_color = [0.0, 0.0, 0.0]
 home_color = [1.0, 1.0, 1.0]
 rain_speed = 2
-rain_drops = [(random.uniform(0, 500), random.uniform(0, 500)) for i in range(1000)]
-
-def check_line_1(x, y):
-    x1, y1, x2, y2 = 150, 150, 250, 250
-    dx = x2 - x1
-    dy = y2 - y1
-    m = dy / dx
-    c = y1 - m * x1
-    eqn = m * x + c
-    if y - 10 > eqn:
-        return True
-    else:
-        return False
-
-def check_line_2(x, y):
-    x1, y1, x2, y2 = 250, 250, 350, 150
-    dx = x2 - x1
-    dy = y2 - y1
-    m = dy / dx
-    c = y1 - m * x1
-    eqn = m * x + c
-    if y - 10 > eqn:
-        return True
-    else:
-        return False
-
-def drawRaindrop(x, y):
-    global angle
-    length = 8
-    rotated_x = x + angle
-    glBegin(GL_LINES)
-    glVertex2f(rotated_x, y)
-    glVertex2f(x, y + length)
-    glEnd()
+# Drops live in two arrays so fall, respawn and the roof test are whole-array
+# operations; RAIN_COUNT can go to 100k+
+RAIN_COUNT = 1000
+rain_x = np.random.uniform(0, 500, RAIN_COUNT)
+rain_y = np.random.uniform(0, 500, RAIN_COUNT)
+RAIN_LENGTH = 8
+rain_verts = np.zeros((2 * RAIN_COUNT, 2), dtype=np.float32)
+
+# Occlusion height map: for every pixel column, the highest point of any
+# registered building. A drop is visible when it is above its column's
+# height, so the test is one array lookup however many buildings there are.
+WIN_SIZE = 500
+height_map = np.full(WIN_SIZE, -np.inf)
+rain_col = np.clip(rain_x.astype(np.intp), 0, WIN_SIZE - 1)
+buildings = []
+house_list = None  # display list of the static scene, built on first draw
+# frame/update timing, see telemetry.py
+stats = Telemetry("rainfall")
+
+HOUSE_ROOF = [(150, 200), (350, 200), (250, 300)]
+HOUSE_WALLS = [(150, 200), (350, 200), (350, 50), (150, 50)]
+
+def add_skyline(points):
+    """Raise the height map to an open polyline [(x, y), ...]."""
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        if x1 > x2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        c0 = max(int(np.ceil(x1)), 0)
+        c1 = min(int(np.floor(x2)), WIN_SIZE - 1)
+        if c0 > c1:
+            continue
+        cols = np.arange(c0, c1 + 1)
+        if x1 == x2:
+            ys = np.full(len(cols), max(y1, y2), dtype=float)
+        else:
+            ys = y1 + (y2 - y1) * (cols - x1) / (x2 - x1)
+        np.maximum(height_map[c0:c1 + 1], ys, out=height_map[c0:c1 + 1])
+
+def add_building(polygon, color=None):
+    """Register a closed polygon as an occluder; with a color it is drawn too."""
+    global house_list
+    add_skyline(list(polygon) + [polygon[0]])
+    if color is not None:
+        buildings.append((polygon, color))
+        if house_list is not None:
+            glDeleteLists(house_list, 1)
+            house_list = None
+
+add_building(HOUSE_ROOF)
+add_building(HOUSE_WALLS)
+
+def rain_visible():
+    return rain_y > height_map[rain_col]
 
 def drawRain():
+    # Every visible drop goes into one preallocated float32 line buffer
+    # (bottom vertex, at the drop's y, skewed by the wind angle) and is
+    # drawn with one call
+    mask = rain_visible()
+    xs, ys = rain_x[mask], rain_y[mask]
+    n = len(xs)
+    if n == 0:
+        return
+    verts = rain_verts[:2 * n]
+    np.add(xs, angle, out=verts[0::2, 0])
+    verts[0::2, 1] = ys
+    verts[1::2, 0] = xs
+    np.add(ys, RAIN_LENGTH, out=verts[1::2, 1])
     glColor3f(173 / 255, 216 / 255, 230 / 255)
-    for x, y in rain_drops:
-        if check_line_1(x, y) or check_line_2(x, y):
-            glLineWidth(2)
-            drawRaindrop(x, y)
-        else:
-            pass
+    glLineWidth(2)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(2, GL_FLOAT, 0, verts)
+    glDrawArrays(GL_LINES, 0, 2 * n)
+    glDisableClientState(GL_VERTEX_ARRAY)
 
 def drawHouse():
     glLineWidth(4)
 
     glColor3f(0.7, 0.2, 0.1)
     glBegin(GL_TRIANGLES)
-    glVertex2d(150, 200)
-    glVertex2d(350, 200)
-    glVertex2d(250, 300)
+    for x, y in HOUSE_ROOF:
+        glVertex2d(x, y)
     glEnd()
 
     glColor3f(0.5, 0.3, 0.2)
     glBegin(GL_QUADS)
-    glVertex2d(150, 200)
-    glVertex2d(350, 200)
-    glVertex2d(350, 50)
-    glVertex2d(150, 50)
+    for x, y in HOUSE_WALLS:
+        glVertex2d(x, y)
     glEnd()
 
     glColor3f(0.3, 0.1, 0.1)
@@ -109,6 +138,15 @@ def drawHouse():
     glVertex2d(330, 150)
     glEnd()
 
+def drawBuildings():
+    # extra buildings registered with add_building(..., color)
+    for polygon, color in buildings:
+        glColor3f(*color)
+        glBegin(GL_POLYGON)
+        for x, y in polygon:
+            glVertex2d(x, y)
+        glEnd()
+
 def specialKeyListener(key, x, y):
     global angle
     if key == GLUT_KEY_RIGHT:
@@ -134,32 +172,57 @@ def specialKeyListener(key, x, y):
             home_color[2] += 0.1
     glutPostRedisplay()
 
+@stats.update
 def animate():
     glutPostRedisplay()
-    global rain_drops, rain_speed
-    for i in range(len(rain_drops)):
-        x, y = rain_drops[i]
-        rain_drops[i] = (x, y - rain_speed)
-        if y - rain_speed < 150:
-            rain_drops[i] = (random.uniform(0, 500), random.uniform(150, 500))
-
-def setup():
-    glViewport(0, 0, 500, 500)
+    rain_y[:] -= rain_speed
+    landed = rain_y < 150
+    n = np.count_nonzero(landed)
+    if n:
+        rain_x[landed] = np.random.uniform(0, 500, n)
+        rain_y[landed] = np.random.uniform(150, 500, n)
+        rain_col[landed] = np.minimum(rain_x[landed].astype(np.intp), WIN_SIZE - 1)
+
+def setup(w=500, h=500):
+    # projection only changes on reshape, not every frame
+    glViewport(0, 0, w, h)
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
     glOrtho(0.0, 500, 0.0, 500, 0.0, 1.0)
     glMatrixMode(GL_MODELVIEW)
     glLoadIdentity()
 
-def showScreen():
-    global bg_color, home_color
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-    glLoadIdentity()
+def init():
     setup()
-    glClearColor(*bg_color, 1.0)
-    glColor3f(home_color[0], home_color[0], home_color[0])
+    # home_color tints the cached house like a uniform: with lighting on and
+    # no lights enabled, each vertex colour (via GL_COLOR_MATERIAL) is scaled
+    # by the global ambient term, which applyHomeColor sets every frame
+    glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
+    glEnable(GL_COLOR_MATERIAL)
+
+def buildHouseList():
+    global house_list
+    house_list = glGenLists(1)
+    glNewList(house_list, GL_COMPILE)
     drawHouse()
+    drawBuildings()
+    glEndList()
+
+def applyHomeColor():
+    glLightModelfv(GL_LIGHT_MODEL_AMBIENT, [*home_color, 1.0])
+
+@stats.display
+def showScreen():
+    glClearColor(*bg_color, 1.0)
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    if house_list is None:
+        buildHouseList()
+    glEnable(GL_LIGHTING)
+    applyHomeColor()
+    glCallList(house_list)
+    glDisable(GL_LIGHTING)
     drawRain()
+    stats.draw_overlay()
     glutSwapBuffers()
 
 glutInit()
@@ -167,7 +230,13 @@ glutInitDisplayMode(GLUT_RGBA | GLUT_DOUBLE | GLUT_DEPTH)
 glutInitWindowSize(500, 500)
 glutInitWindowPosition(0, 0)
 glutCreateWindow(b"Rainy House")
+init()
 glutDisplayFunc(showScreen)
+glutReshapeFunc(setup)
 glutIdleFunc(animate)
 glutSpecialFunc(specialKeyListener)
+# return from glutMainLoop when the window is closed instead of letting
+# freeglut exit() past the atexit handlers, then write the telemetry
+glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)
 glutMainLoop()
+stats.close()
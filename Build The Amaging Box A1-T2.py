@@ -1,31 +1,76 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
-import random
+import time
+import numpy as np
+from spatial import CellIndex
+from telemetry import Telemetry
 
 WIN_WIDTH, WIN_HEIGHT = 600, 600
-balls = []
-ball_speed = 0.05
+# Balls are parallel arrays (position, direction, colour); capacity doubles
+# when full and only the first ball_count rows are live
+ball_count = 0
+ball_pos = np.zeros((64, 2), dtype=np.float32)
+ball_dir = np.zeros((64, 2), dtype=np.float32)
+ball_col = np.zeros((64, 3), dtype=np.float32)
+ball_speed = 60.0  # pixels per second along each axis
+# Motion runs on a fixed step driven by the real clock; if the idle loop
+# falls behind, at most MAX_CATCH_UP steps are replayed and the rest dropped
+FIXED_DT = 1 / 120
+MAX_CATCH_UP = 8
+last_time = None
+accumulator = 0.0
+# glPointSize(8): balls touch when their centres are one diameter apart.
+# The broadphase grid uses diameter-sized cells so only neighbours are tested.
+BALL_RADIUS = 4.0
+ball_grid = CellIndex(2 * BALL_RADIUS)
+COLLISION_PASSES = 4
+collisions = True
 color_flag = False
 is_paused = False
+# frame/update timing, see telemetry.py
+stats = Telemetry("bouncing_balls")
 
 def convert_coords(x, y):
     return x, WIN_HEIGHT - y
 
+def grow_balls(needed):
+    global ball_pos, ball_dir, ball_col
+    cap = len(ball_pos)
+    while cap < needed:
+        cap *= 2
+    if cap == len(ball_pos):
+        return
+    for name in ('ball_pos', 'ball_dir', 'ball_col'):
+        old = globals()[name]
+        new = np.zeros((cap, old.shape[1]), dtype=old.dtype)
+        new[:ball_count] = old[:ball_count]
+        globals()[name] = new
+
+def add_balls(xs, ys):
+    global ball_count
+    n = len(xs)
+    grow_balls(ball_count + n)
+    new = slice(ball_count, ball_count + n)
+    ball_pos[new, 0] = xs
+    ball_pos[new, 1] = ys
+    ball_dir[new] = np.random.choice([-1, 1], (n, 2))
+    ball_col[new] = np.random.uniform(0.5, 1, (n, 3))
+    ball_count += n
+
+def add_ball(x, y):
+    add_balls([x], [y])
+
 def toggle_color(dummy):  # Modified to accept the 'dummy' argument
     global color_flag
     color_flag = not color_flag
     glutPostRedisplay()
 
 def mouse_click(button, state, x, y):
-    global balls, is_paused, color_flag
+    global is_paused, color_flag
     if not is_paused:
         if button == GLUT_RIGHT_BUTTON and state == GLUT_DOWN:
-            balls.append({
-                'pos': convert_coords(x, y),
-                'dir': (random.choice([-1, 1]), random.choice([-1, 1])),
-                'col': (random.uniform(0.5, 1), random.uniform(0.5, 1), random.uniform(0.5, 1))
-            })
+            add_ball(*convert_coords(x, y))
         if button == GLUT_LEFT_BUTTON and state == GLUT_DOWN:
             color_flag = True
             glutTimerFunc(1000, toggle_color, 0)  # This line remains the same
@@ -41,9 +86,10 @@ def special_keys(key, x, y):
     glutPostRedisplay()
 
 def keyboard(key, x, y):
-    global is_paused
+    global is_paused, last_time
     if key == b' ':
         is_paused = not is_paused
+        last_time = None  # resume without replaying the paused time
     glutPostRedisplay()
 
 def setup():
@@ -54,49 +100,111 @@ def setup():
     glMatrixMode(GL_MODELVIEW)
     glLoadIdentity()
 
+@stats.display
 def draw():
-    global balls, color_flag
+    global color_flag
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
     setup()
-    if balls:
-        for ball in balls:
-            x, y = ball['pos']
-            glPointSize(8.0)
-            glBegin(GL_POINTS)
-            if color_flag:
-                glColor3f(0.2, 0.2, 0.2)
-            else:
-                glColor3f(ball['col'][0], ball['col'][1], ball['col'][2])
-            glVertex2f(x, y)
-            glEnd()
+    if ball_count:
+        # every ball in one colored point-array call
+        glPointSize(8.0)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, ball_pos)
+        if color_flag:
+            glColor3f(0.2, 0.2, 0.2)
+        else:
+            glEnableClientState(GL_COLOR_ARRAY)
+            glColorPointer(3, GL_FLOAT, 0, ball_col)
+        glDrawArrays(GL_POINTS, 0, ball_count)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+    stats.draw_overlay()
     glutSwapBuffers()
 
+def collide_balls():
+    # Elastic collisions between equal masses: swap the velocity components
+    # along the line of centres for every touching pair that is approaching.
+    # Pairs are resolved in a few passes, each one a matching (no ball in two
+    # pairs), so every exchange is exact and crowds don't gain energy.
+    n = ball_count
+    pos, vel = ball_pos[:n], ball_dir[:n]
+    i, j = ball_grid.build(pos).pairs_within(2 * BALL_RADIUS)
+    delta = pos[j] - pos[i]
+    dist = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+    ok = dist > 0
+    i, j = i[ok], j[ok]
+    normal = delta[ok] / dist[ok, None]
+    for _ in range(COLLISION_PASSES):
+        if len(i) == 0:
+            return
+        # a pair is taken when it is the lowest-numbered pair of both balls
+        pair = np.arange(len(i))
+        first = np.full(n, len(i))
+        np.minimum.at(first, i, pair)
+        np.minimum.at(first, j, pair)
+        take = (first[i] == pair) & (first[j] == pair)
+        ti, tj, tn = i[take], j[take], normal[take]
+        approach = np.einsum('ij,ij->i', vel[ti] - vel[tj], tn)
+        hit = approach > 0
+        impulse = tn[hit] * approach[hit, None]
+        vel[ti[hit]] -= impulse
+        vel[tj[hit]] += impulse
+        i, j, normal = i[~take], j[~take], normal[~take]
+
+def step(dt):
+    if not ball_count:
+        return
+    pos = ball_pos[:ball_count]
+    d = ball_dir[:ball_count]
+    pos += d * (ball_speed * dt)
+    # reflect off the walls: point the direction back into the box (setting
+    # the sign, not flipping it, so a ball a collision pushed outwards can't
+    # oscillate past the wall) and put the ball back inside
+    size = np.array((WIN_WIDTH, WIN_HEIGHT), dtype=pos.dtype)
+    np.copyto(d, np.abs(d), where=pos < 0)
+    np.copyto(d, -np.abs(d), where=pos > size)
+    np.clip(pos, 0, size, out=pos)
+    if collisions:
+        collide_balls()
+
+@stats.update
 def update():
     glutPostRedisplay()
-    global balls, ball_speed, WIN_WIDTH, WIN_HEIGHT, is_paused
-    if not is_paused:
-        for ball in balls:
-            x, y = ball['pos']
-            dx, dy = ball['dir']
-            x += dx * ball_speed
-            y += dy * ball_speed
-            if x < 0 or x > WIN_WIDTH:
-                ball['dir'] = (-dx, dy)
-            if y < 0 or y > WIN_HEIGHT:
-                ball['dir'] = (dx, -dy)
-            ball['pos'] = (x, y)
-
-glutInit()
-glutInitWindowSize(WIN_WIDTH, WIN_HEIGHT)
-glutInitWindowPosition(0, 0)
-glutInitDisplayMode(GLUT_DEPTH | GLUT_DOUBLE | GLUT_RGB)
-glutCreateWindow(b"Bouncing Balls")
-
-glutDisplayFunc(draw)
-glutIdleFunc(update)
-glutKeyboardFunc(keyboard)
-glutSpecialFunc(special_keys)
-glutMouseFunc(mouse_click)
-
-glutMainLoop()
\ No newline at end of file
+    global last_time, accumulator
+    now = time.perf_counter()
+    if is_paused or last_time is None:
+        last_time = now
+        accumulator = 0.0
+        return
+    accumulator += now - last_time
+    last_time = now
+    steps = 0
+    while accumulator >= FIXED_DT and steps < MAX_CATCH_UP:
+        step(FIXED_DT)
+        accumulator -= FIXED_DT
+        steps += 1
+    if steps == MAX_CATCH_UP:
+        accumulator = min(accumulator, FIXED_DT)
+
+def main():
+    glutInit()
+    glutInitWindowSize(WIN_WIDTH, WIN_HEIGHT)
+    glutInitWindowPosition(0, 0)
+    glutInitDisplayMode(GLUT_DEPTH | GLUT_DOUBLE | GLUT_RGB)
+    glutCreateWindow(b"Bouncing Balls")
+
+    glutDisplayFunc(draw)
+    glutIdleFunc(update)
+    glutKeyboardFunc(keyboard)
+    glutSpecialFunc(special_keys)
+    glutMouseFunc(mouse_click)
+
+    # return from glutMainLoop when the window is closed instead of letting
+    # freeglut exit() past the atexit handlers, then write the telemetry
+    glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)
+    glutMainLoop()
+    stats.close()
+
+if __name__ == "__main__":
+    main()
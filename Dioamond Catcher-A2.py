@@ -2,6 +2,11 @@ from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
 import random
+import numpy as np
+from raster import line_points
+from clip import clip_segments, cyrus_beck_times, window_margin
+from text_cache import draw_text
+from telemetry import Telemetry
 
 WIN_W, WIN_H = 640, 800
 
@@ -14,94 +19,70 @@ paused = False
 pause_icon = True  # True: Pause icon দেখাও, False: Play icon দেখাও
 base_speed = 2
 speed_increase_per_score = 0.25
+# fall_speed is tuned in pixels per 18 ms tick; the timer can run coarser
+# because catching uses the swept path of the diamond, not just its position
+BASE_TICK_MS = 18
+TICK_MS = 33
+# Stress mode: many diamonds at once, kept in NumPy arrays (toggle with 's')
+stress_mode = False
+STRESS_COUNT = 5000
+swarm = {}
+# frame/update timing, see telemetry.py
+stats = Telemetry("diamond_catcher")
+# Everything is clipped to the window before rasterising; 'c' swaps in a
+# convex octagon window (Cyrus-Beck) instead of the rectangle
+CLIP_RECT = (0, 0, WIN_W - 1, WIN_H - 1)
+CLIP_OCTAGON = [(200, 0), (440, 0), (WIN_W - 1, 200), (WIN_W - 1, 600),
+                (440, WIN_H - 1), (200, WIN_H - 1), (0, 600), (0, 200)]
+clip_polygon = None
 
-def draw_pixel(x, y, color):
+def draw_pixels(pts, color):
+    # All pixels of a shape go to GL as one point array
     glColor3f(*color)
     glPointSize(2)
-    glBegin(GL_POINTS)
-    glVertex2f(x, y)
-    glEnd()
-
-def zone_of_line(x1, y1, x2, y2):
-    dx, dy = x2 - x1, y2 - y1
-    if abs(dx) >= abs(dy):
-        if dx >= 0 and dy >= 0: return 0
-        if dx < 0 and dy >= 0: return 3
-        if dx < 0 and dy < 0: return 4
-        return 7
-    else:
-        if dx >= 0 and dy >= 0: return 1
-        if dx < 0 and dy >= 0: return 2
-        if dx < 0 and dy < 0: return 5
-        return 6
-
-def to_zone0(x, y, zone):
-    ops = [lambda x, y: (x, y),
-           lambda x, y: (y, x),
-           lambda x, y: (y, -x),
-           lambda x, y: (-x, y),
-           lambda x, y: (-x, -y),
-           lambda x, y: (-y, -x),
-           lambda x, y: (-y, x),
-           lambda x, y: (x, -y)]
-    return ops[zone](x, y)
-
-def from_zone0(x, y, zone):
-    ops = [lambda x, y: (x, y),
-           lambda x, y: (y, x),
-           lambda x, y: (-y, x),
-           lambda x, y: (-x, y),
-           lambda x, y: (-x, -y),
-           lambda x, y: (-y, -x),
-           lambda x, y: (y, -x),
-           lambda x, y: (x, -y)]
-    return ops[zone](x, y)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(2, GL_FLOAT, 0, np.asarray(pts, dtype=np.float32))
+    glDrawArrays(GL_POINTS, 0, len(pts))
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+def draw_segments(segs, color):
+    # Clip the whole batch first; only visible parts reach the rasteriser
+    visible = clip_segments(segs, rect=CLIP_RECT, polygon=clip_polygon)
+    pts = []
+    for x1, y1, x2, y2 in np.rint(visible).astype(int).tolist():
+        pts += line_points(x1, y1, x2, y2)
+    if pts:
+        draw_pixels(pts, color)
 
 def midpoint_draw(x1, y1, x2, y2, color):
-    zone = zone_of_line(x1, y1, x2, y2)
-    tx1, ty1 = to_zone0(x1, y1, zone)
-    tx2, ty2 = to_zone0(x2, y2, zone)
-    if tx1 > tx2:
-        tx1, ty1, tx2, ty2 = tx2, ty2, tx1, ty1
-    dx, dy = tx2 - tx1, ty2 - ty1
-    d = 2*dy - dx
-    incE, incNE = 2*dy, 2*(dy-dx)
-    y = ty1
-    for x in range(tx1, tx2+1):
-        px, py = from_zone0(x, y, zone)
-        draw_pixel(px, py, color)
-        if d < 0:
-            d += incE
-        else:
-            d += incNE
-            y += 1
+    draw_segments([(x1, y1, x2, y2)], color)
 
 def draw_arrow_left():
     # Teal color
     c = (0, 1, 1)
-    midpoint_draw(45, 760, 65, 780, c)
-    midpoint_draw(45, 760, 65, 740, c)
-    midpoint_draw(45, 760, 90, 760, c)
+    draw_segments([(45, 760, 65, 780),
+                   (45, 760, 65, 740),
+                   (45, 760, 90, 760)], c)
 
 def draw_pause_button():
     # Show pause or play icon depending on state
     if pause_icon:
         # Pause icon (Amber color)
         c = (1, 0.75, 0)
-        midpoint_draw(300, 780, 300, 730, c)
-        midpoint_draw(340, 780, 340, 730, c)
+        draw_segments([(300, 780, 300, 730),
+                       (340, 780, 340, 730)], c)
     else:
         # Play icon (Amber color) — right-pointing triangle
         c = (1, 0.75, 0)
-        midpoint_draw(300, 780, 340, 755, c)
-        midpoint_draw(340, 755, 300, 730, c)
-        midpoint_draw(300, 730, 300, 780, c)
+        draw_segments([(300, 780, 340, 755),
+                       (340, 755, 300, 730),
+                       (300, 730, 300, 780)], c)
 
 def draw_cross_button():
     csx, csy, hs = 615, 755, 15
     c = (1, 0, 0)
-    midpoint_draw(csx - hs, csy - hs, csx + hs, csy + hs, c)
-    midpoint_draw(csx - hs, csy + hs, csx + hs, csy - hs, c)
+    draw_segments([(csx - hs, csy - hs, csx + hs, csy + hs),
+                   (csx - hs, csy + hs, csx + hs, csy - hs)], c)
 
 def random_bright_color():
     while True:
@@ -114,59 +95,171 @@ def draw_diamond():
     global diamond
     x, y, s = diamond['x'], diamond['y'], diamond['size']
     color = diamond.get('color', (1, 1, 0))
-    midpoint_draw(x, y + s, x + s, y, color)
-    midpoint_draw(x + s, y, x, y - s, color)
-    midpoint_draw(x, y - s, x - s, y, color)
-    midpoint_draw(x - s, y, x, y + s, color)
+    draw_segments([(x, y + s, x + s, y),
+                   (x + s, y, x, y - s),
+                   (x, y - s, x - s, y),
+                   (x - s, y, x, y + s)], color)
 
 def draw_catcher():
     cx = catcher['x']
     color = catcher['color']
-    midpoint_draw(cx, 70, cx + 50, 100, color)
-    midpoint_draw(cx + 50, 100, cx + 170, 100, color)
-    midpoint_draw(cx + 170, 100, cx + 220, 70, color)
-    midpoint_draw(cx + 220, 70, cx, 70, color)
+    draw_segments([(cx, 70, cx + 50, 100),
+                   (cx + 50, 100, cx + 170, 100),
+                   (cx + 170, 100, cx + 220, 70),
+                   (cx + 220, 70, cx, 70)], color)
+
+def diamond_offsets(s):
+    # Pixel outline of a diamond centred at the origin, rasterised once
+    pts = (line_points(0, s, s, 0) + line_points(s, 0, 0, -s) +
+           line_points(0, -s, -s, 0) + line_points(-s, 0, 0, s))
+    return np.array(pts, dtype=np.float32)
+
+def draw_swarm():
+    # One batched pixel pass for the diamonds inside the clip window. Every
+    # pixel is within s of its diamond's centre: diamonds more than s outside
+    # are rejected before expansion, and only the pixels of those straddling
+    # an edge are tested one by one
+    pos, offs, s = swarm['pos'], swarm['offsets'], diamond['size']
+    margin = window_margin(pos, rect=CLIP_RECT, polygon=clip_polygon)
+    idx = np.flatnonzero(margin >= -s)
+    n, k = len(idx), len(offs)
+    pixels = swarm['pixels'][:n]
+    np.add(pos[idx, None, :], offs[None, :, :], out=pixels)
+    colors = swarm['pixel_colors'].reshape(-1, k, 3)
+    swarm['draw_colors'][:n] = colors[idx]
+    pixels, draw_colors = pixels.reshape(-1, 2), swarm['draw_colors'][:n].reshape(-1, 3)
+    edge = margin[idx] < s
+    if edge.any():
+        keep = np.ones((n, k), dtype=bool)
+        keep[edge] = window_margin(swarm['pixels'][:n][edge], rect=CLIP_RECT,
+                                   polygon=clip_polygon).reshape(-1, k) >= 0
+        pixels, draw_colors = pixels[keep.ravel()], draw_colors[keep.ravel()]
+    glPointSize(2)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glVertexPointer(2, GL_FLOAT, 0, pixels)
+    glColorPointer(3, GL_FLOAT, 0, draw_colors)
+    glDrawArrays(GL_POINTS, 0, len(pixels))
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
 
 def draw_score():
     glColor3f(1,1,1)
-    glRasterPos2f(20, 780)
-    for ch in f"Score: {score}":
-        glutBitmapCharacter(GLUT_BITMAP_9_BY_15, ord(ch))
+    draw_text(20, 780, f"Score: {score}", GLUT_BITMAP_9_BY_15)
+    if stress_mode:
+        draw_text(20, 720, f"Missed: {swarm['missed']}", GLUT_BITMAP_9_BY_15)
 
+@stats.display
 def display():
     glClear(GL_COLOR_BUFFER_BIT)
     draw_arrow_left()
     draw_pause_button()
     draw_cross_button()
-    draw_diamond()
+    if stress_mode:
+        draw_swarm()
+    else:
+        draw_diamond()
     draw_catcher()
     draw_score()
     if game_over:
         glColor3f(1,0,0)
-        glRasterPos2f(250, 410)
-        for ch in "GAME OVER":
-            glutBitmapCharacter(GLUT_BITMAP_HELVETICA_18, ord(ch))
+        draw_text(250, 410, "GAME OVER")
     elif paused:
         glColor3f(1,1,0)
-        glRasterPos2f(250, 410)
-        for ch in "PAUSED":
-            glutBitmapCharacter(GLUT_BITMAP_HELVETICA_18, ord(ch))
+        draw_text(250, 410, "PAUSED")
+    stats.draw_overlay()
     glutSwapBuffers()
 
-def diamond_caught():
+def catcher_shape():
     cx = catcher['x']
-    left = cx
-    right = cx+220
-    up_y = 100
-    down_y = 70
-    dx, dy = diamond['x'], diamond['y']-diamond['size']
-    return (left < dx < right) and (down_y < dy < up_y)
+    return [(cx, 70), (cx + 50, 100), (cx + 170, 100), (cx + 220, 70)]
+
+def swept_hit(x0, y0, x1, y1, poly):
+    # Cyrus-Beck: clip the segment p0->p1 against the convex polygon and
+    # return the entry time t in [0, 1], or None when it misses
+    t_in, _, visible = cyrus_beck_times([(x0, y0, x1, y1)], poly)
+    return float(t_in[0]) if visible[0] else None
+
+def diamond_caught(prev_y=None):
+    # Tip of the diamond sweeps from its previous to its current position
+    dx = diamond['x']
+    dy = diamond['y'] - diamond['size']
+    py = dy if prev_y is None else prev_y - diamond['size']
+    return swept_hit(dx, py, dx, dy, catcher_shape())
 
+def random_bright_colors(n):
+    c = np.random.uniform(0.5, 1, (n, 3)).astype(np.float32)
+    dark = c.sum(axis=1) <= 2
+    while dark.any():
+        c[dark] = np.random.uniform(0.5, 1, (dark.sum(), 3))
+        dark = c.sum(axis=1) <= 2
+    return c
+
+def swarm_respawn(idx, spread=0):
+    n = len(idx)
+    swarm['pos'][idx, 0] = np.random.randint(65, WIN_W-65, n)
+    swarm['pos'][idx, 1] = 650 + np.random.uniform(0, spread, n)
+    swarm['speed'][idx] = np.random.uniform(base_speed, base_speed * 3, n)
+    swarm['color'][idx] = random_bright_colors(n)
+    k = len(swarm['offsets'])
+    swarm['pixel_colors'].reshape(-1, k, 3)[idx] = swarm['color'][idx, None, :]
+
+def swarm_reset(n=STRESS_COUNT):
+    global swarm
+    offsets = diamond_offsets(diamond['size'])
+    swarm = {
+        'pos': np.zeros((n, 2), dtype=np.float32),
+        'speed': np.zeros(n, dtype=np.float32),
+        'color': np.zeros((n, 3), dtype=np.float32),
+        'offsets': offsets,
+        'pixels': np.zeros((n, len(offsets), 2), dtype=np.float32),
+        'pixel_colors': np.zeros((n * len(offsets), 3), dtype=np.float32),
+        'draw_colors': np.zeros((n, len(offsets), 3), dtype=np.float32),
+        'missed': 0,
+    }
+    # stagger the start heights so the swarm arrives as a stream
+    swarm_respawn(np.arange(n), spread=WIN_H * 2)
+
+def catcher_top(x):
+    # Height of the catcher's upper edge above column x (trapezoid profile)
+    rx = x - catcher['x']
+    return np.minimum(100, np.minimum(70 + rx * 0.6, 70 + (220 - rx) * 0.6))
+
+def swarm_caught(step):
+    # one vectorized band test picks the tips that could have crossed the
+    # catcher's height this tick; only those are tested against its shape
+    tips = swarm['pos'][:, 1] - diamond['size']
+    near = np.flatnonzero((tips <= 100) & (tips + step >= 70))
+    x = swarm['pos'][near, 0]
+    left = catcher['x']
+    near = near[(x > left) & (x < left + 220)]
+    new_tip = tips[near]
+    prev_tip = new_tip + step[near]
+    hit = (prev_tip >= 70) & (new_tip <= catcher_top(swarm['pos'][near, 0]))
+    return near[hit]
+
+def swarm_update():
+    global score
+    step = swarm['speed'] * (TICK_MS / BASE_TICK_MS)
+    swarm['pos'][:, 1] -= step
+    caught = swarm_caught(step)
+    if len(caught):
+        score += len(caught)
+        swarm_respawn(caught)
+    missed = np.flatnonzero(swarm['pos'][:, 1] - diamond['size'] < 60)
+    if len(missed):
+        swarm['missed'] += len(missed)
+        swarm_respawn(missed)
+
+@stats.update
 def update(val=0):
     global diamond, score, game_over, fall_speed
-    if not game_over and not paused:
-        diamond['y'] -= fall_speed
-        if diamond_caught():
+    if stress_mode and not paused:
+        swarm_update()
+    elif not game_over and not paused:
+        prev_y = diamond['y']
+        diamond['y'] -= fall_speed * TICK_MS / BASE_TICK_MS
+        if diamond_caught(prev_y) is not None:
             score += 1
             print(f"Score: {score}")
             diamond['x'] = random.randint(65, WIN_W-65)
@@ -176,7 +269,7 @@ def update(val=0):
         elif diamond['y'] - diamond['size'] < 60:
             game_over_routine()
     glutPostRedisplay()
-    glutTimerFunc(18, update, 0)
+    glutTimerFunc(TICK_MS, update, 0)
 
 def game_over_routine():
     global game_over, catcher
@@ -193,8 +286,15 @@ def key_control(key, x, y):
     glutPostRedisplay()
 
 def keyboard(key, x, y):
+    global stress_mode, clip_polygon
+    if key == b'c':
+        clip_polygon = None if clip_polygon else CLIP_OCTAGON
+        glutPostRedisplay()
     if key == b'r':
         restart_game()
+    if key == b's':
+        stress_mode = not stress_mode
+        restart_game()
 
 def restart_game():
     global game_over, score, diamond, catcher, paused, fall_speed
@@ -207,6 +307,8 @@ def restart_game():
     paused = False
     fall_speed = base_speed
     catcher['color'] = (1,1,1)
+    if stress_mode:
+        swarm_reset()
     print("Starting Over!")
     glutPostRedisplay()
 
@@ -243,7 +345,11 @@ def main():
     glutSpecialFunc(key_control)
     glutKeyboardFunc(keyboard)
     glutMouseFunc(mouse)
+    # return from glutMainLoop when the window is closed instead of letting
+    # freeglut exit() past the atexit handlers, then write the telemetry
+    glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)
     glutMainLoop()
+    stats.close()
 
 if __name__ == "__main__":
     main()
@@ -2,6 +2,11 @@ from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
 import math, time, random
+import numpy as np
+from text_cache import text_cache
+from spatial import CellIndex
+from meshes import sphere, cube, cylinder
+from telemetry import Telemetry
 
 # --------------------
 # GLOBAL SETTINGS
@@ -9,9 +14,6 @@ import math, time, random
 hero_position = [0.0, 0.0, 0.0]  # x, y, z
 hero_angle = 0.0
 eye_height = 15.0
-ammo_list = []f
-foe_list = []
-spark_list = []
 auto_mode = False
 fp_camera = False
 cheat_mode = False
@@ -27,289 +29,444 @@ end_flag = False
 end_printed = False
 
 MAX_FOES = 5
+# Horde mode ('h'): thousands of foes, all kept in NumPy arrays
+HORDE_FOES = 2000
+horde_mode = False
 MAX_MISSED = 10
 ARENA_SIZE = 1000
+SPARK_CAPACITY = 4096
+# Floor and walls never change: they are compiled once into a display list.
+# FLOOR_TILES tiles per side, so finer floors cost nothing per frame.
+FLOOR_TILES = 20
+floor_list = None
+# Hero model: standing and fallen variants cached as display lists
+hero_lists = {}
+
+# Collision radii, compared squared so no sqrt is needed
+PLAYER_HIT_DIST = 30
+BULLET_HIT_DIST = 15
+# Foes are indexed in a uniform grid every frame so each bullet only
+# tests the foes in its neighbouring cells (cell size >= hit distance)
+GRID_CELL = 50
+foe_index = CellIndex(GRID_CELL)
+
+# Simulation clock. The wall clock is read once per frame in tick_clock();
+# everything else uses sim_time. Per-frame speeds below are tuned for
+# SIM_RATE updates per second and scaled by dt * SIM_RATE. Set FIXED_STEP
+# (e.g. 1/60) to integrate in fixed steps, at most MAX_STEPS per frame.
+SIM_RATE = 60.0
+FIXED_STEP = None
+MAX_STEPS = 5
+MAX_FRAME_DT = 0.25
+sim_time = 0.0
+last_frame_time = None
+step_accumulator = 0.0
+# frame/update timing, see telemetry.py
+stats = Telemetry("enemy_down")
 
 # --------------------
 # BULLET CUBES
 # --------------------
-def make_bullet(x, y, z, angle, target=None):
-    return {
-        'x': x, 'y': y, 'z': z,
-        'angle': angle,
-        'born': time.time(),
-        'hit': False,
-        'hit_target': False,
-        'lock': target
-    }
-
-def update_bullet(b):
-    if b['hit']:
-        return
-    speed = 5
-    if b['lock'] and not b['lock']['down']:
-        dx = b['lock']['x'] - b['x']
-        dy = b['lock']['y'] - b['y']
-        dz = b['lock']['z'] - b['z']
-        dist = math.sqrt(dx*dx + dy*dy + dz*dz)
-        if dist > 0:
-            b['x'] += (dx/dist) * speed
-            b['y'] += (dy/dist) * speed
-            b['z'] += (dz/dist) * speed
-    else:
-        nx = b['x'] + speed * math.sin(math.radians(b['angle']))
-        nz = b['z'] + speed * math.cos(math.radians(b['angle']))
+class Bullets:
+    """Live bullets as parallel NumPy arrays, packed into the first `count`
+    rows. The heading is a unit vector worked out once at fire time; a
+    homing bullet keeps its target as (foe slot, generation), slot -1 for
+    none."""
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.pos = np.zeros((capacity, 3))
+        self.head = np.zeros((capacity, 3))
+        self.born = np.zeros(capacity)
+        self.lock_slot = np.full(capacity, -1, dtype=np.int64)
+        self.lock_gen = np.zeros(capacity, dtype=np.int64)
+        self.hit = np.zeros(capacity, dtype=bool)
+        self.hit_target = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, needed):
+        cap = len(self.born)
+        while cap < needed:
+            cap *= 2
+        if cap == len(self.born):
+            return
+        for name, old in list(vars(self).items()):
+            if isinstance(old, np.ndarray):
+                new = np.zeros((cap,) + old.shape[1:], dtype=old.dtype)
+                new[:self.count] = old[:self.count]
+                vars(self)[name] = new
+
+    def add(self, x, y, z, angle, target=None):
+        self._grow(self.count + 1)
+        i = self.count
+        a = math.radians(angle)
+        self.pos[i] = (x, y, z)
+        self.head[i] = (math.sin(a), 0.0, math.cos(a))
+        self.born[i] = sim_time
+        self.lock_slot[i], self.lock_gen[i] = target if target else (-1, 0)
+        self.hit[i] = False
+        self.hit_target[i] = False
+        self.count += 1
+
+    def update(self, k=1.0):
+        n = self.count
+        pos, hit, slot = self.pos[:n], self.hit[:n], self.lock_slot[:n]
+        speed = 5 * k
+        # homing: step towards the gathered target positions
+        locked = ~hit & (slot >= 0)
+        locked[locked] = foes.gen[slot[locked]] == self.lock_gen[:n][locked]
+        li = np.flatnonzero(locked)
+        d = foes.pos[slot[li]] - pos[li]
+        dist = np.sqrt(np.einsum('ij,ij->i', d, d))
+        step = np.divide(speed, dist, out=np.zeros(len(li)), where=dist > 0)
+        pos[li] += d * step[:, None]
+        # straight: along the heading until the arena wall
+        fi = np.flatnonzero(~hit & ~locked)
+        nxt = pos[fi] + self.head[fi] * speed
         half = (ARENA_SIZE/2) - 5
-        if abs(nx) < half and abs(nz) < half:
-            b['x'], b['z'] = nx, nz
-        else:
-            b['hit'] = True
-            for _ in range(10):
-                spark_list.append(make_spark(b['x'], b['y'], b['z']))
-
-def bullet_alive(b):
-    return time.time() - b['born'] < 5 and not b['hit']
-
-def draw_bullet(b):
-    glPushMatrix()
-    glColor3f(1, 0, 0)
-    glTranslatef(b['x'], b['y'], b['z'])
-    glutSolidCube(6)
-    glPopMatrix()
+        inside = (np.abs(nxt[:, 0]) < half) & (np.abs(nxt[:, 2]) < half)
+        pos[fi[inside]] = nxt[inside]
+        wall = fi[~inside]
+        hit[wall] = True
+        sparks.emit_many(pos[wall], 10)
+
+    def expire(self):
+        """Drop dead bullets; returns how many of them missed."""
+        n = self.count
+        alive = (sim_time - self.born[:n] < 5) & ~self.hit[:n]
+        missed = int(np.count_nonzero(~alive & ~self.hit_target[:n]))
+        keep = np.flatnonzero(alive)
+        self.count = len(keep)
+        for arr in vars(self).values():
+            if isinstance(arr, np.ndarray):
+                arr[:self.count] = arr[keep]
+        return missed
+
+    def clear(self):
+        self.count = 0
+
+    def draw(self):
+        cube().draw_instances(self.pos[:self.count], 6, (1, 0, 0))
+
+ammo = Bullets()
 
 # --------------------
 # ENEMIES
 # --------------------
-def make_enemy():
-    e = respawn_enemy()
-    e['marked'] = False
-    e['down'] = False
-    return e
-
-def respawn_enemy(dummy=None):
-    ang = random.uniform(0, 2*math.pi)
-    dist = random.uniform(300, 450)
-    return {
-        'x': dist*math.sin(ang),
-        'y': 15,
-        'z': dist*math.cos(ang),
-        'speed': random.uniform(0.2, 0.5),
-        'scale': 1.0,
-        'dir': 0.02,
-        'born': time.time(),
-        'down': False,
-        'marked': False
-    }
-
-def update_enemy(e):
-    dx = hero_position[0] - e['x']
-    dz = hero_position[2] - e['z']
-    dist = math.sqrt(dx*dx + dz*dz)
-    if dist > 0:
-        e['x'] += (dx/dist) * e['speed']
-        e['z'] += (dz/dist) * e['speed']
-    e['scale'] += e['dir']
-    if e['scale'] > 1.2 or e['scale'] < 0.8:
-        e['dir'] *= -1
-
-def draw_enemy(e):
-    if e['down']: return
-    glPushMatrix()
-    glTranslatef(e['x'], e['y'], e['z'])
-    glScalef(e['scale'], e['scale'], e['scale'])
-    glColor3f(1,0,0)
-    glutSolidSphere(15, 20, 20)
-    glPushMatrix()
-    glColor3f(0,0,0)
-    glTranslatef(0,15,0)
-    glutSolidSphere(10,16,16)
-    glPopMatrix()
-    glPopMatrix()
-
-def enemy_hit_player(e):
-    dx = hero_position[0] - e['x']
-    dz = hero_position[2] - e['z']
-    return math.sqrt(dx*dx + dz*dz) < 30
-
-def enemy_hit_bullet(e, b):
-    dx = b['x'] - e['x']
-    dz = b['z'] - e['z']
-    return math.sqrt(dx*dx + dz*dz) < 15
+class Foes:
+    """All foes as parallel NumPy arrays, one slot per foe. Slots are never
+    removed: a foe that is shot or reaches the hero respawns in place and
+    its generation goes up, so a bullet locked on (slot, gen) can tell
+    that its target is gone."""
+    def __init__(self, count):
+        self.next_gen = 0
+        self.resize(count)
+
+    def resize(self, count):
+        # new slots start past every generation handed out so far, so no
+        # old (slot, gen) lock can match a foe created after the resize
+        if len(getattr(self, 'gen', ())):
+            self.next_gen = max(self.next_gen, int(self.gen.max()) + 1)
+        self.count = count
+        self.pos = np.zeros((count, 3))
+        self.pos[:, 1] = 15
+        self.speed = np.zeros(count)
+        self.scale = np.ones(count)
+        self.dir = np.zeros(count)
+        self.marked = np.zeros(count, dtype=bool)
+        self.gen = np.full(count, self.next_gen, dtype=np.int64)
+        self.respawn(np.arange(count))
+
+    def respawn(self, idx):
+        n = len(idx)
+        ang = np.random.uniform(0, 2*math.pi, n)
+        dist = np.random.uniform(300, 450, n)
+        self.pos[idx, 0] = dist * np.sin(ang)
+        self.pos[idx, 2] = dist * np.cos(ang)
+        self.speed[idx] = np.random.uniform(0.2, 0.5, n)
+        self.scale[idx] = 1.0
+        self.dir[idx] = 0.02
+        self.marked[idx] = False
+        self.gen[idx] += 1
+
+    def update(self, k=1.0):
+        # home in on the hero and pulse, every foe at once
+        dx = hero_position[0] - self.pos[:, 0]
+        dz = hero_position[2] - self.pos[:, 2]
+        dist = np.hypot(dx, dz)
+        step = np.divide(self.speed * k, dist, out=np.zeros(self.count), where=dist > 0)
+        self.pos[:, 0] += dx * step
+        self.pos[:, 2] += dz * step
+        self.scale += self.dir * k
+        self.dir[(self.scale > 1.2) | (self.scale < 0.8)] *= -1
+
+    def xz(self):
+        return self.pos[:, [0, 2]]
+
+    def touching(self, x, z, radius):
+        d = self.xz() - (x, z)
+        return np.flatnonzero(np.einsum('ij,ij->i', d, d) < radius * radius)
+
+    def nearest_unmarked(self, x, z):
+        # one vectorized pass over the unmarked foes; the foes move every
+        # frame, so any index would have to be rebuilt for each shot
+        idx = np.flatnonzero(~self.marked)
+        if len(idx) == 0:
+            return None
+        dx = self.pos[idx, 0] - x
+        dz = self.pos[idx, 2] - z
+        return int(idx[np.argmin(dx*dx + dz*dz)])
+
+    def draw(self):
+        # body and head spheres, each shape drawn as one instanced batch
+        sphere(20, 20).draw_instances(self.pos, 15 * self.scale, (1, 0, 0))
+        head = self.pos.copy()
+        head[:, 1] += 15 * self.scale
+        sphere(16, 16).draw_instances(head, 10 * self.scale, (0, 0, 0))
+
+foes = Foes(MAX_FOES)
+
+def set_horde(on):
+    global horde_mode
+    horde_mode = on
+    foes.resize(HORDE_FOES if on else MAX_FOES)
+    # locks point at slots of the old arrays: bullets in flight fly straight
+    ammo.lock_slot[:] = -1
 
 # --------------------
 # PARTICLES
 # --------------------
-def make_spark(x,y,z):
-    return {
-        'x':x,'y':y,'z':z,
-        'dx':random.uniform(-3,3),
-        'dy':random.uniform(0,5),
-        'dz':random.uniform(-3,3),
-        'life':1.0,
-        'col':[1.0, random.uniform(0.5,1.0),0]
-    }
-
-def update_spark(p):
-    p['x'] += p['dx']
-    p['y'] += p['dy']
-    p['z'] += p['dz']
-    p['dy'] -= 0.2
-    p['life'] -= 0.05
-
-def spark_alive(p): return p['life']>0
-
-def draw_spark(p):
-    glPushMatrix()
-    glColor4f(p['col'][0], p['col'][1], p['col'][2], p['life'])
-    glTranslatef(p['x'],p['y'],p['z'])
-    glutSolidSphere(2,5,5)
-    glPopMatrix()
+class SparkPool:
+    """Fixed-capacity ring buffer of sparks kept in NumPy arrays.
+    New sparks overwrite the oldest slots, so nothing is allocated per
+    particle; dead sparks have alpha 0 and are skipped by the alpha test."""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 3), dtype=np.float32)
+        self.vel = np.zeros((capacity, 3), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.col = np.zeros((capacity, 4), dtype=np.float32)  # alpha follows life
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.step = np.zeros((capacity, 3), dtype=np.float32)
+        self.head = 0
+
+    def emit(self, x, y, z, count):
+        self.emit_many(((x, y, z),), count)
+
+    def emit_many(self, points, count):
+        # count sparks at each point, all written in one go
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        count *= len(points)
+        if count == 0:
+            return
+        idx = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+        self.pos[idx] = np.repeat(points, count // len(points), axis=0)
+        self.vel[idx, 0] = np.random.uniform(-3, 3, count)
+        self.vel[idx, 1] = np.random.uniform(0, 5, count)
+        self.vel[idx, 2] = np.random.uniform(-3, 3, count)
+        self.life[idx] = 1.0
+        self.col[idx, 0] = 1.0
+        self.col[idx, 1] = np.random.uniform(0.5, 1.0, count)
+        self.col[idx, 2] = 0.0
+        self.col[idx, 3] = 1.0
+
+    def update(self, k=1.0):
+        # gravity and fade for live sparks only, all in place
+        alive = np.greater(self.life, 0, out=self.alive)
+        np.multiply(self.vel, k, out=self.step)
+        np.add(self.pos, self.step, out=self.pos, where=alive[:, None])
+        np.subtract(self.vel[:, 1], 0.2 * k, out=self.vel[:, 1], where=alive)
+        np.subtract(self.life, 0.05 * k, out=self.life, where=alive)
+        np.clip(self.life, 0.0, 1.0, out=self.col[:, 3])
+
+    def count(self):
+        return int(np.count_nonzero(self.life > 0))
+
+    def clear(self):
+        self.life[:] = 0
+        self.col[:, 3] = 0
+        self.head = 0
+
+    def draw(self):
+        # one blended point batch for the whole pool
+        glPushAttrib(GL_ENABLE_BIT | GL_DEPTH_BUFFER_BIT | GL_COLOR_BUFFER_BIT | GL_POINT_BIT)
+        glDisable(GL_LIGHTING)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnable(GL_ALPHA_TEST)
+        glAlphaFunc(GL_GREATER, 0.0)
+        glDepthMask(GL_FALSE)
+        glEnable(GL_POINT_SMOOTH)
+        glPointSize(4)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.pos)
+        glColorPointer(4, GL_FLOAT, 0, self.col)
+        glDrawArrays(GL_POINTS, 0, self.capacity)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glPopAttrib()
+
+sparks = SparkPool(SPARK_CAPACITY)
 
 # --------------------
 # HERO DRAWING
 # --------------------
-def draw_hero():
-    glPushMatrix()
-    glTranslatef(hero_position[0], hero_position[1], hero_position[2])
-    glRotatef(hero_angle,0,1,0)
-    if end_flag:
+def build_hero_model(fallen):
+    if fallen:
         glRotatef(90,1,0,0)
     glColor3f(0.6,0,1)
     for lx in [7,-7]:
         glPushMatrix()
         glTranslatef(lx,20,0)
-        quad = gluNewQuadric()
-        gluCylinder(quad,6,3,25,12,6)
+        cylinder(6,3,25,12,6).draw()
         glPopMatrix()
     glColor3f(0.2,0.8,0.2)
     glPushMatrix()
     glTranslatef(0,35,0)
     glScalef(20,30,10)
-    glutSolidCube(1)
+    cube().draw()
     glPopMatrix()
     glColor3f(0,0,0)
     glPushMatrix()
     glTranslatef(0,60,0)
-    glutSolidSphere(10,16,16)
+    glScalef(10,10,10)
+    sphere(16,16).draw()
     glPopMatrix()
     glColor3f(0.8,0.7,0.6)
     for ax in [-12,12]:
         glPushMatrix()
         glTranslatef(ax,45,0)
-        quad = gluNewQuadric()
-        gluCylinder(quad,4,2,18,12,2)
+        cylinder(4,2,18,12,2).draw()
         glPopMatrix()
-    if not end_flag:
+    if not fallen:
         glColor3f(0.7,0.7,0.7)
         glPushMatrix()
         glTranslatef(0,38,12)
-        quad = gluNewQuadric()
-        gluCylinder(quad,3.5,2,20,12,2)
+        cylinder(3.5,2,20,12,2).draw()
         glPopMatrix()
+
+def hero_model(fallen):
+    # tessellated once per variant into a display list, then replayed
+    list_id = hero_lists.get(fallen)
+    if list_id is None:
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        build_hero_model(fallen)
+        glEndList()
+        hero_lists[fallen] = list_id
+    return list_id
+
+def draw_hero():
+    glPushMatrix()
+    glTranslatef(hero_position[0], hero_position[1], hero_position[2])
+    glRotatef(hero_angle,0,1,0)
+    glCallList(hero_model(end_flag))
     glPopMatrix()
 
 # --------------------
 # FLOOR + WALLS
 # --------------------
-def draw_floor():
+def build_floor_geometry(tiles):
+    # checkerboard quads covering the arena plus the four walls, as flat
+    # position/colour arrays (four vertices per quad)
+    size = ARENA_SIZE / tiles
+    i, j = np.meshgrid(np.arange(tiles), np.arange(tiles), indexing='ij')
+    i, j = i.ravel(), j.ravel()
+    # tile edges from -ARENA_SIZE/2, so odd tile counts are centred too
+    x1, z1 = i * size - ARENA_SIZE / 2, j * size - ARENA_SIZE / 2
+    x2, z2 = x1 + size, z1 + size
+    verts = np.empty((len(i), 4, 3), dtype=np.float32)
+    verts[:, :, 1] = -1
+    verts[:, 0, 0], verts[:, 0, 2] = x1, z1
+    verts[:, 1, 0], verts[:, 1, 2] = x2, z1
+    verts[:, 2, 0], verts[:, 2, 2] = x2, z2
+    verts[:, 3, 0], verts[:, 3, 2] = x1, z2
+    light = ((i + j) % 2 == 0)[:, None, None]
+    cols = np.where(light, (0.8, 0.8, 0.8), (0.3, 0.2, 0.5)).astype(np.float32)
+    cols = np.broadcast_to(cols, (len(i), 4, 3))
+    half = ARENA_SIZE / 2
+    wh = 70
+    wall_verts = np.array([
+        (-half, -1, -half), (half, -1, -half), (half, wh, -half), (-half, wh, -half),
+        (half, -1, -half), (half, -1, half), (half, wh, half), (half, wh, -half),
+        (half, -1, half), (-half, -1, half), (-half, wh, half), (half, wh, half),
+        (-half, -1, half), (-half, -1, -half), (-half, wh, -half), (-half, wh, half),
+    ], dtype=np.float32)
+    wall_cols = np.repeat(np.array([(1, 1, 1), (0, 1, 0), (0, 1, 1), (0, 0, 1)],
+                                   dtype=np.float32), 4, axis=0)
+    return (np.ascontiguousarray(np.concatenate([verts.reshape(-1, 3), wall_verts])),
+            np.ascontiguousarray(np.concatenate([cols.reshape(-1, 3), wall_cols])))
+
+def build_floor_list():
+    # the arrays are copied into the display list when it is compiled
+    verts, cols = build_floor_geometry(FLOOR_TILES)
+    list_id = glGenLists(1)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, verts)
+    glColorPointer(3, GL_FLOAT, 0, cols)
+    glNewList(list_id, GL_COMPILE)
     glDisable(GL_LIGHTING)
-    size=50
-    for i in range(-10,10):
-        for j in range(-10,10):
-            if (i+j)%2==0:
-                glColor3f(0.8,0.8,0.8)
-            else:
-                glColor3f(0.3,0.2,0.5)
-            x1,z1=i*size,j*size
-            x2,z2=(i+1)*size,(j+1)*size
-            glBegin(GL_QUADS)
-            glVertex3f(x1,-1,z1)
-            glVertex3f(x2,-1,z1)
-            glVertex3f(x2,-1,z2)
-            glVertex3f(x1,-1,z2)
-            glEnd()
-    half=ARENA_SIZE/2
-    wh=70
-    glBegin(GL_QUADS)
-    glColor3f(1,1,1)
-    glVertex3f(-half,-1,-half)
-    glVertex3f(half,-1,-half)
-    glVertex3f(half,wh,-half)
-    glVertex3f(-half,wh,-half)
-    glColor3f(0,1,0)
-    glVertex3f(half,-1,-half)
-    glVertex3f(half,-1,half)
-    glVertex3f(half,wh,half)
-    glVertex3f(half,wh,-half)
-    glColor3f(0,1,1)
-    glVertex3f(half,-1,half)
-    glVertex3f(-half,-1,half)
-    glVertex3f(-half,wh,half)
-    glVertex3f(half,wh,half)
-    glColor3f(0,0,1)
-    glVertex3f(-half,-1,half)
-    glVertex3f(-half,-1,-half)
-    glVertex3f(-half,wh,-half)
-    glVertex3f(-half,wh,half)
-    glEnd()
+    glDrawArrays(GL_QUADS, 0, len(verts))
     glEnable(GL_LIGHTING)
+    glEndList()
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    return list_id
+
+def draw_floor():
+    global floor_list
+    if floor_list is None:
+        floor_list = build_floor_list()
+    glCallList(floor_list)
 
 # --------------------
 # GAME LOOP UPDATE
 # --------------------
-def update_game():
-    global ammo_list, foe_list, spark_list
+def update_game(dt=1/SIM_RATE):
     global score,lives,missed_shots,end_flag,end_printed
+    k = dt * SIM_RATE
     if end_flag:
         if not end_printed:
             print("Game Over!!")
             end_printed=True
         return
-    nb=[]
-    for b in ammo_list:
-        update_bullet(b)
-        if bullet_alive(b):
-            nb.append(b)
-        else:
-            if not b['hit_target']:
-                missed_shots+=1
-                if missed_shots>=MAX_MISSED: end_flag=True
-    ammo_list=nb
-    while len(foe_list)<MAX_FOES:
-        foe_list.append(make_enemy())
-    nf=[]
-    for e in foe_list:
-        update_enemy(e)
-        if enemy_hit_player(e):
-            lives-=1
-            if lives<=0: end_flag=True
-            for _ in range(20):
-                spark_list.append(make_spark(e['x'], e['y'], e['z']))
-            e=respawn_enemy()
-        hit=False
-        for b in ammo_list:
-            if not b['hit'] and enemy_hit_bullet(e,b):
-                b['hit']=True
-                b['hit_target']=True
-                e['down']=True
-                score+=1
-                for _ in range(15):
-                    spark_list.append(make_spark(e['x'],e['y'],e['z']))
-                e=respawn_enemy()
-                hit=True
-                break
-        if not hit: nf.append(e)
-    foe_list=nf
-    spark_list[:]=[p for p in spark_list if spark_alive(p)]
-    for p in spark_list: update_spark(p)
+    ammo.update(k)
+    missed_shots += ammo.expire()
+    if missed_shots>=MAX_MISSED: end_flag=True
+    foes.update(k)
+    touching = foes.touching(hero_position[0], hero_position[2], PLAYER_HIT_DIST)
+    if len(touching):
+        lives-=len(touching)
+        if lives<=0: end_flag=True
+        sparks.emit_many(foes.pos[touching], 20)
+        foes.respawn(touching)
+    live = np.flatnonzero(~ammo.hit[:ammo.count])
+    if len(live):
+        bi, fi = foe_index.build(foes.xz()).query(ammo.pos[live][:, [0, 2]], BULLET_HIT_DIST)
+        # one foe per bullet and one bullet per foe
+        used, shot = set(), {}
+        for q, j in zip(bi.tolist(), fi.tolist()):
+            if q in used or j in shot:
+                continue
+            used.add(q)
+            shot[j] = live[q]
+        if shot:
+            idx = np.fromiter(shot, dtype=np.int64, count=len(shot))
+            hits = np.fromiter(shot.values(), dtype=np.int64, count=len(shot))
+            ammo.hit[hits] = True
+            ammo.hit_target[hits] = True
+            score+=len(shot)
+            sparks.emit_many(foes.pos[idx], 15)
+            foes.respawn(idx)
+    sparks.update(k)
 
 # --------------------
 # DRAW STATUS TEXT
 # --------------------
 def draw_text(x, y, text):
-    glRasterPos2f(x, y)
-    for ch in text:
-        glutBitmapCharacter(GLUT_BITMAP_HELVETICA_18, ord(ch))
+    # compiled once per distinct string, replayed while the line is unchanged
+    text_cache.draw(x, y, text)
 
 def draw_status():
     glMatrixMode(GL_PROJECTION)
@@ -329,6 +486,8 @@ def draw_status():
     draw_text(15, 165, f"Auto Mode: {'ON' if auto_mode else 'OFF'}")
     if cheat_mode:
         draw_text(15, 195, f"CHEAT MODE ACTIVE!")
+    if horde_mode:
+        draw_text(15, 225, f"HORDE: {foes.count} foes")
 
     if end_flag:
         draw_text(250, 300, "GAME OVER! Press R to restart")
@@ -342,6 +501,7 @@ def draw_status():
 # --------------------
 # RENDER
 # --------------------
+@stats.display
 def show():
     glClearColor(0.18,0.18,0.23,1)
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -350,13 +510,11 @@ def show():
     draw_floor()
     if not fp_camera or end_flag:
         draw_hero()
-    for b in ammo_list:
-        draw_bullet(b)
-    for e in foe_list:
-        draw_enemy(e)
-    for p in spark_list:
-        draw_spark(p)
+    ammo.draw()
+    foes.draw()
+    sparks.draw()
     draw_status()
+    stats.draw_overlay()
     glutSwapBuffers()
 
 def set_camera():
@@ -384,42 +542,34 @@ def set_camera():
 # --------------------
 def fire(cheat=False):
     global last_fire_time, hero_angle
-    now = time.time()
+    now = sim_time
     if cheat:
         if now - last_fire_time < 0.2:
             return
         bx = hero_position[0]
         by = hero_position[1] + eye_height + 10
         bz = hero_position[2]
-        ammo_list.append(make_bullet(bx, by, bz, hero_angle))
+        ammo.add(bx, by, bz, hero_angle)
         last_fire_time = now
         return
 
     target = None
     if auto_mode:
-        close = None
-        md = float('inf')
-        for e in foe_list:
-            if not e['down'] and not e['marked']:
-                dx = e['x'] - hero_position[0]
-                dz = e['z'] - hero_position[2]
-                d = math.sqrt(dx*dx + dz*dz)
-                if d < md:
-                    md, close = d, e
-        if close:
-            target = close
-            target['marked'] = True
+        i = foes.nearest_unmarked(hero_position[0], hero_position[2])
+        if i is not None:
+            foes.marked[i] = True
+            target = (i, int(foes.gen[i]))
 
     if fp_camera:
         bx = hero_position[0]
         by = hero_position[1] + eye_height + 10
         bz = hero_position[2]
-        ammo_list.append(make_bullet(bx, by, bz, hero_angle, target))
+        ammo.add(bx, by, bz, hero_angle, target)
     else:
         bx = hero_position[0] + 25 * math.sin(math.radians(hero_angle))
         by = hero_position[1] + 35
         bz = hero_position[2] + 25 * math.cos(math.radians(hero_angle))
-        ammo_list.append(make_bullet(bx, by, bz, hero_angle, target))
+        ammo.add(bx, by, bz, hero_angle, target)
 
 def move_hero(dx, dz):
     nx = hero_position[0] + dx
@@ -446,6 +596,8 @@ def key_press(key, x, y):
         cheat_mode = not cheat_mode
     elif key == b'v':
         auto_gun_follow = not auto_gun_follow
+    elif key == b'h':
+        set_horde(not horde_mode)
     elif key == b'f':
         fire()
 
@@ -471,14 +623,14 @@ def mouse_click(btn, state, x, y):
 # RESET + IDLE
 # --------------------
 def reset():
-    global hero_position, hero_angle, ammo_list, foe_list, spark_list
+    global hero_position, hero_angle
     global auto_mode, fp_camera, cheat_mode, auto_gun_follow
     global score, lives, missed_shots, end_flag, end_printed
     hero_position = [0,0,0]
     hero_angle = 0
-    ammo_list.clear()
-    foe_list.clear()
-    spark_list.clear()
+    ammo.clear()
+    foes.respawn(np.arange(foes.count))
+    sparks.clear()
     auto_mode = False
     fp_camera = False
     cheat_mode = False
@@ -489,14 +641,39 @@ def reset():
     end_flag=False
     end_printed=False
 
-def idle():
-    global hero_angle
-    update_game()
+def tick_clock():
+    # the only wall-clock read per frame
+    global last_frame_time
+    now = time.time()
+    dt = 0.0 if last_frame_time is None else min(now - last_frame_time, MAX_FRAME_DT)
+    last_frame_time = now
+    return dt
+
+def simulate(dt):
+    global hero_angle, sim_time
+    sim_time += dt
+    update_game(dt)
     if cheat_mode:
-        hero_angle += 5
+        hero_angle += 5 * dt * SIM_RATE
         if hero_angle >= 360:
             hero_angle -= 360
         fire(cheat=True)
+
+@stats.update
+def idle():
+    global step_accumulator
+    dt = tick_clock()
+    if FIXED_STEP:
+        step_accumulator += dt
+        steps = 0
+        while step_accumulator >= FIXED_STEP and steps < MAX_STEPS:
+            simulate(FIXED_STEP)
+            step_accumulator -= FIXED_STEP
+            steps += 1
+        if steps == MAX_STEPS:
+            step_accumulator = 0.0
+    elif dt > 0:
+        simulate(dt)
     glutPostRedisplay()
 
 # --------------------
@@ -509,16 +686,28 @@ def init():
     glEnable(GL_COLOR_MATERIAL)
     glColorMaterial(GL_FRONT, GL_AMBIENT_AND_DIFFUSE)
     glShadeModel(GL_SMOOTH)
-
-glutInit()
-glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGBA | GLUT_DEPTH)
-glutInitWindowSize(800,600)
-glutInitWindowPosition(100,100)
-glutCreateWindow(b"3D Shooter Game")
-init()
-glutDisplayFunc(show)
-glutKeyboardFunc(key_press)
-glutSpecialFunc(key_special)
-glutMouseFunc(mouse_click)
-glutIdleFunc(idle)
-glutMainLoop()
+    # unit meshes are scaled up by the modelview, so renormalise for lighting
+    glEnable(GL_NORMALIZE)
+
+def main():
+    glutInit()
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGBA | GLUT_DEPTH)
+    glutInitWindowSize(800,600)
+    glutInitWindowPosition(100,100)
+    glutCreateWindow(b"3D Shooter Game")
+    init()
+    glutDisplayFunc(show)
+    glutKeyboardFunc(key_press)
+    glutSpecialFunc(key_special)
+    glutMouseFunc(mouse_click)
+    glutIdleFunc(idle)
+    # return from glutMainLoop when the window is closed instead of letting
+    # freeglut exit() past the atexit handlers, then write the telemetry
+    glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)
+    glutMainLoop()
+    stats.close()
+
+# importing the script (e.g. from shooter_bench.py) gives a fresh game
+# state without opening a window
+if __name__ == "__main__":
+    main()
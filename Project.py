@@ -19,6 +19,8 @@ import random
 import time
 import sys
 
+import numpy as np
+
 try:
     from OpenGL.GL import *
     from OpenGL.GLU import *
@@ -27,6 +29,13 @@ except Exception:
     print("PyOpenGL and GLUT are required. Install with: pip install PyOpenGL PyOpenGL_accelerate")
     sys.exit(1)
 
+# repo-local modules stay outside the check above, so their own errors
+# are not reported as a missing PyOpenGL
+from text_cache import text_cache
+from meshes import sphere, cube, cylinder
+import immediate as im
+from telemetry import Telemetry
+
 # ----------------------------
 # Global constants & settings
 # ----------------------------
@@ -74,9 +83,13 @@ def within_arena(x, z, margin=0.4):
     return (x*x + z*z) <= (ARENA_RADIUS - margin) ** 2
 
 def draw_text_2d(x, y, text, font=GLUT_BITMAP_HELVETICA_18):
-    glRasterPos2f(x, y)
-    for ch in text:
-        glutBitmapCharacter(font, ord(ch))
+    # cached display list per string; see text_cache.py
+    text_cache.draw(x, y, text, font)
+
+def swap_remove(items, i):
+    # O(1) removal that does not keep order: the last item fills the hole
+    last = items.pop()
+    if i < len(items): items[i] = last
 
 def world_to_screen_setup(width, height):
     glMatrixMode(GL_PROJECTION)
@@ -97,18 +110,21 @@ def world_to_screen_restore():
 # Classes for game elements
 # ----------------------------
 class Obstacle:
+    __slots__ = ('x', 'z')
     def __init__(self, x, z):
         self.x = x; self.z = z
     def draw(self):
         glPushMatrix()
         glTranslatef(self.x, 0.0, self.z)
         glColor3f(0.5, 0.35, 0.2)
-        glutSolidCube(CELL_SIZE * 0.9)
+        glScalef(CELL_SIZE * 0.9, CELL_SIZE * 0.9, CELL_SIZE * 0.9)
+        cube().draw()
         glPopMatrix()
     def collides(self, x, z, r=0.45*CELL_SIZE):
         return abs(x - self.x) < r and abs(z - self.z) < r
 
 class PowerUp:
+    __slots__ = ('x', 'z', 'ptype')
     def __init__(self, x, z, ptype):
         self.x, self.z, self.ptype = x, z, ptype
     def draw(self):
@@ -117,10 +133,12 @@ class PowerUp:
         if self.ptype == 0: glColor3f(1.0, 0.6, 0.15)  # +capacity
         elif self.ptype == 1: glColor3f(1.0, 0.2, 0.2)  # +range
         else: glColor3f(0.4, 0.6, 1.0)                  # +speed
-        glutSolidSphere(0.35, 10, 10)
+        glScalef(0.35, 0.35, 0.35)
+        sphere(10, 10).draw()
         glPopMatrix()
 
 class Bomb:
+    __slots__ = ('x', 'z', 'start', 'range_cells')
     def __init__(self, x, z, range_cells):
         self.x, self.z, self.start = x, z, time.time()
         self.range_cells = range_cells
@@ -131,13 +149,14 @@ class Bomb:
         t = self.timer; pulse = 0.9 + 0.25 * math.sin(t*8.0)
         glPushMatrix()
         glTranslatef(self.x, 0.25, self.z)
-        glScalef(pulse, pulse, pulse)
+        glScalef(0.30*pulse, 0.30*pulse, 0.30*pulse)
         glColor3f(0.1, 0.1, 0.1)
-        glutSolidSphere(0.30, 12, 12)
+        sphere(12, 12).draw()
         glPopMatrix()
 
 class Explosion:
     """Transient visual after a bomb detonates; drawn in display pass for ~0.35s."""
+    __slots__ = ('x', 'z', 'radius', 'start', 'duration')
     def __init__(self, x, z, radius):
         self.x, self.z = x, z
         self.radius = radius
@@ -150,19 +169,18 @@ class Explosion:
         t = clamp(t, 0.0, 1.0)
         alpha = 1.0 - t
         scale = 0.8 + 0.4 * t
-        glPushMatrix()
-        glTranslatef(self.x, 0.12, self.z)
-        glColor4f(1.0, 0.6, 0.1, alpha)
+        # recorded in world coordinates; World.display flushes all explosions at once
+        x, y, z = self.x, 0.12, self.z
+        im.color(1.0, 0.6, 0.1, alpha)
         for i in range(16):
             ang = (2*math.pi) * i/16.0
             dx = math.cos(ang) * self.radius * scale
             dz = math.sin(ang) * self.radius * scale
-            glBegin(GL_TRIANGLES)
-            glVertex3f(0, 0, 0)
-            glVertex3f(dx, 0, dz)
-            glVertex3f(dx*0.7, 0, dz*0.7)
-            glEnd()
-        glPopMatrix()
+            im.begin(GL_TRIANGLES)
+            im.vertex(x, y, z)
+            im.vertex(x+dx, y, z+dz)
+            im.vertex(x+dx*0.7, y, z+dz*0.7)
+            im.end()
 
 class Player:
     def __init__(self, x=0.0, z=0.0):
@@ -190,9 +208,10 @@ class Player:
         glPushMatrix(); glTranslatef(self.x, 0.5, self.z)
         if self.invincible: glColor3f(1.0,0.95,0.3)
         else: glColor3f(0.2,0.8,0.2)
-        glutSolidSphere(0.5, 14, 14); glPopMatrix()
+        glScalef(0.5, 0.5, 0.5); sphere(14, 14).draw(); glPopMatrix()
 
 class Enemy:
+    __slots__ = ('x', 'z', 'face', 'speed')
     def __init__(self, x, z):
         self.x, self.z, self.face = x, z, random.uniform(0, 2*math.pi)
         self.speed = ENEMY_SPEED
@@ -207,9 +226,11 @@ class Enemy:
         if world.can_move_to(nx, nz): self.x, self.z = nx, nz
     def draw(self):
         glPushMatrix(); glTranslatef(self.x,0.45,self.z)
-        glColor3f(0.9,0.3,0.9); glutSolidSphere(0.45,12,12); glPopMatrix()
+        glScalef(0.45,0.45,0.45)
+        glColor3f(0.9,0.3,0.9); sphere(12,12).draw(); glPopMatrix()
 
 class Boss:
+    __slots__ = ('x', 'z', 'face', 'hp')
     def __init__(self, x, z):
         self.x, self.z = x, z
         self.face = random.uniform(0, 2*math.pi)
@@ -233,21 +254,21 @@ class Boss:
             world.game_over("The boss cleaved you!")
     def draw(self):
         glPushMatrix(); glTranslatef(self.x,0.9,self.z); glScalef(2,2,2)
-        glColor3f(0.2,0.2,0.9); glutSolidSphere(0.5,18,18)
+        glPushMatrix(); glScalef(0.5,0.5,0.5)
+        glColor3f(0.2,0.2,0.9); sphere(18,18).draw()
+        glPopMatrix()
         # Axe
         glPushMatrix()
         glRotatef(math.degrees(self.face),0,1,0)
         glTranslatef(0.6,-0.2,0.0)
-        quad=gluNewQuadric()
         glColor3f(0.45,0.3,0.15)
         glRotatef(-90,1,0,0)
-        gluCylinder(quad,0.05,0.05,0.9,10,1)
+        cylinder(0.05,0.05,0.9,10,1).draw()
         glTranslatef(0.0,0.0,0.6)
         glRotatef(90,0,1,0)
         glScalef(0.5,0.7,0.12)
         glColor3f(0.8,0.85,0.95)
-        glutSolidCube(1.0)
-        gluDeleteQuadric(quad)
+        cube().draw()
         glPopMatrix()
         glPopMatrix()
 
@@ -293,19 +314,18 @@ class Weather:
     def draw(self):
         # snow
         if self.snow_intensity>0.02:
-            glColor3f(1,1,1)
-            for p in self.snow:
-                glPushMatrix(); glTranslatef(p[0],p[1],p[2])
-                glutSolidSphere(0.08*(0.6+0.4*self.snow_intensity),6,6)
-                glPopMatrix()
+            # every flake in one instanced batch
+            pos=np.array(self.snow,dtype=np.float32)[:,:3]
+            sphere(6,6).draw_instances(pos,0.08*(0.6+0.4*self.snow_intensity),(1,1,1))
         # rain
         if self.sky_dark>0.05:
             rain_brightness=0.5+0.5*self.sky_dark
-            glColor3f(0.7*rain_brightness,0.8*rain_brightness,1.0*rain_brightness)
-            glBegin(GL_LINES)
+            im.color(0.7*rain_brightness,0.8*rain_brightness,1.0*rain_brightness)
+            im.begin(GL_LINES)
             for r in self.rain:
-                glVertex3f(r[0],r[1],r[2]); glVertex3f(r[0]-self.wind*0.3,r[1]+0.6,r[2])
-            glEnd()
+                im.vertex(r[0],r[1],r[2]); im.vertex(r[0]-self.wind*0.3,r[1]+0.6,r[2])
+            im.end()
+            im.flush()
 
 # ----------------------------
 # Game world orchestrator
@@ -325,6 +345,7 @@ class World:
     # ---------- setup ----------
     def seed_arena(self):
         self.obstacles=[]
+        self.obstacle_pos=None  # instance positions for the draw pass
         for gx in range(GRID_SIZE):
             for gz in range(GRID_SIZE):
                 if random.random()<OBSTACLE_DENSITY:
@@ -377,45 +398,48 @@ class World:
         self.bombs.append(Bomb(x,z,self.player.explosion_range))
         self.player.bombs_active+=1
 
+    # Entity lists are edited in place with swap_remove (walking backwards
+    # so the swapped-in item has already been visited): no per-frame lists.
     def process_explosions(self):
-        removed=[]
-        for b in self.bombs:
-            if b.exploded():
-                # enqueue a transient explosion effect for the draw pass
-                self.explosions.append(Explosion(b.x, b.z, b.range_cells*CELL_SIZE))
-                r2=(b.range_cells*CELL_SIZE)**2
-                # enemies
-                self.enemies=[e for e in self.enemies if dist2(e.x,e.z,b.x,b.z)>r2]
-                # boss
-                if self.boss and dist2(self.boss.x,self.boss.z,b.x,b.z)<=r2:
-                    self.boss.hp-=1
-                # obstacles + powerups
-                keep=[]
-                for ob in self.obstacles:
-                    if dist2(ob.x,ob.z,b.x,b.z)<=r2:
-                        if random.random()<POWERUP_CHANCE:
-                            self.powerups.append(PowerUp(ob.x,ob.z,random.randint(0,2)))
-                    else:
-                        keep.append(ob)
-                self.obstacles=keep
-                removed.append(b)
-        for b in removed:
-            self.bombs.remove(b)
+        bombs=self.bombs
+        for i in range(len(bombs)-1,-1,-1):
+            b=bombs[i]
+            if not b.exploded(): continue
+            # enqueue a transient explosion effect for the draw pass
+            self.explosions.append(Explosion(b.x, b.z, b.range_cells*CELL_SIZE))
+            r2=(b.range_cells*CELL_SIZE)**2
+            # enemies
+            enemies=self.enemies
+            for j in range(len(enemies)-1,-1,-1):
+                if dist2(enemies[j].x,enemies[j].z,b.x,b.z)<=r2: swap_remove(enemies,j)
+            # boss
+            if self.boss and dist2(self.boss.x,self.boss.z,b.x,b.z)<=r2:
+                self.boss.hp-=1
+            # obstacles + powerups
+            obstacles=self.obstacles
+            for j in range(len(obstacles)-1,-1,-1):
+                ob=obstacles[j]
+                if dist2(ob.x,ob.z,b.x,b.z)<=r2:
+                    if random.random()<POWERUP_CHANCE:
+                        self.powerups.append(PowerUp(ob.x,ob.z,random.randint(0,2)))
+                    swap_remove(obstacles,j)
+                    self.obstacle_pos=None
+            swap_remove(bombs,i)
             self.player.bombs_active=max(0,self.player.bombs_active-1)
 
     def prune_explosions(self):
-        if self.explosions:
-            self.explosions = [e for e in self.explosions if e.alive()]
+        explosions=self.explosions
+        for i in range(len(explosions)-1,-1,-1):
+            if not explosions[i].alive(): swap_remove(explosions,i)
 
     def collect_powerups(self):
         px,pz=self.player.x,self.player.z
-        keep=[]
-        for p in self.powerups:
+        powerups=self.powerups
+        for i in range(len(powerups)-1,-1,-1):
+            p=powerups[i]
             if math.hypot(p.x-px,p.z-pz)<0.6:
                 self.player.apply_powerup(p.ptype)
-            else:
-                keep.append(p)
-        self.powerups=keep
+                swap_remove(powerups,i)
 
     def maybe_spawn_boss(self):
         if self.game_is_over or self.victory: return
@@ -473,16 +497,21 @@ class World:
     # ---------- rendering ----------
     def draw_arena(self):
         segments=64
-        glPushMatrix()
         day_mix=1.0-self.weather.sky_dark
-        glColor3f(0.1+0.2*day_mix, 0.35+0.15*day_mix, 0.1+0.1*day_mix)
-        glBegin(GL_TRIANGLE_FAN)
-        glVertex3f(0,0,0)
+        im.color(0.1+0.2*day_mix, 0.35+0.15*day_mix, 0.1+0.1*day_mix)
+        im.begin(GL_TRIANGLE_FAN)
+        im.vertex(0,0,0)
         for i in range(segments+1):
             ang=(2*math.pi)*i/segments
-            glVertex3f(math.cos(ang)*ARENA_RADIUS, 0, math.sin(ang)*ARENA_RADIUS)
-        glEnd()
-        glPopMatrix()
+            im.vertex(math.cos(ang)*ARENA_RADIUS, 0, math.sin(ang)*ARENA_RADIUS)
+        im.end()
+        im.flush()
+
+    def draw_obstacles(self):
+        # all crates are one cube mesh: rebuilt only when obstacles change
+        if self.obstacle_pos is None:
+            self.obstacle_pos=np.array([(ob.x,0.0,ob.z) for ob in self.obstacles],dtype=np.float32)
+        cube().draw_instances(self.obstacle_pos, CELL_SIZE*0.9, (0.5,0.35,0.2))
 
     def display(self):
         # sky first (must be BEFORE glClear)
@@ -502,7 +531,7 @@ class World:
         glEnable(GL_DEPTH_TEST)
 
         self.draw_arena()
-        for ob in self.obstacles: ob.draw()
+        self.draw_obstacles()
         for p in self.powerups: p.draw()
         for b in self.bombs: b.draw()
         for e in self.enemies: e.draw()
@@ -515,6 +544,7 @@ class World:
             glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
             for ex in self.explosions:
                 ex.draw()
+            im.flush()
             glDisable(GL_BLEND)
 
         # weather last so particles overlay scene
@@ -522,6 +552,8 @@ class World:
 
         # HUD
         self.draw_hud()
+        im.recorder.end_frame()
+        stats.draw_overlay()
 
         glutSwapBuffers()
 
@@ -531,6 +563,8 @@ class World:
         draw_text_2d(10, self.height - 20, f"Bombs: {self.player.bombs_active}/{self.player.bomb_capacity}")
         draw_text_2d(10, self.height - 38, f"Range: {self.player.explosion_range}  Speed: {self.player.speed:.2f}")
         draw_text_2d(10, self.height - 56, f"Boss defeats: {self.boss_kills}/{BOSS_KILLS_TO_WIN}")
+        # GL calls the batched recorder saved over glBegin/glEnd last frame
+        draw_text_2d(10, 10, f"GL calls saved: {im.recorder.saved_last_frame}")
         if self.player.invincible:
             glColor3f(1.0,1.0,0.2)
             draw_text_2d(10, self.height - 74, "CHEATS: INVINCIBLE (I)")
@@ -546,7 +580,7 @@ class World:
     # ---------- input ----------
     def on_key_down(self, key, x, y):
         if key == KEY_ESC:
-            sys.exit(0)
+            glutLeaveMainLoop()
         elif key == KEY_SPACE and not self.game_is_over:
             self.try_place_bomb()
         elif key == KEY_P:
@@ -579,10 +613,14 @@ class World:
 # GLUT glue
 # ----------------------------
 WORLD = None
+# frame/update timing, see telemetry.py
+stats = Telemetry("bomber_arena")
 
+@stats.display
 def display_cb():
     if WORLD: WORLD.display()
 
+@stats.update
 def idle_cb():
     if WORLD:
         WORLD.step()
@@ -621,7 +659,11 @@ def main():
     glutSpecialFunc(special_cb)
     glutReshapeFunc(reshape_cb)
 
+    # return from glutMainLoop when the window is closed instead of letting
+    # freeglut exit() past the atexit handlers, then write the telemetry
+    glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)
     glutMainLoop()
+    stats.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,139 @@
+"""
+Bomber Arena allocation check
+-----------------------------
+Imports Project.py without opening a window and runs World.step on a
+simulated clock (1/60 s per frame) while the player walks around dropping
+bombs, so bombs explode, explosions fade and power-ups spawn and get
+picked up inside the measured frames.
+
+The entity-list upkeep (process_explosions, prune_explosions,
+collect_powerups) is wrapped so every call records the bytes it
+allocated and freed again within the call, from tracemalloc's peak.
+The run is done twice from the same seed: once with a few hundred extra
+explosions and power-ups parked in the lists, once with four times as
+many. Rebuilding the lists every frame costs memory in proportion to
+their length; pruning them in place does not, so the per-frame churn of
+the two runs must match to within CHURN_SLACK bytes.
+
+Also prints the memory used per obstacle by seed_arena.
+Exits non-zero when the check fails.
+
+Run: python alloc_check.py [--frames 2000]
+"""
+
+import argparse
+import random
+import sys
+import tracemalloc
+
+import Project
+
+class SimClock:
+    """Stands in for the time module inside Project: advances one frame per step."""
+    def __init__(self, dt):
+        self.now, self.dt = 1000.0, dt
+    def time(self):
+        return self.now
+    def tick(self):
+        self.now += self.dt
+
+def run_frames(world, clock, frames, bomber=False, frame=0):
+    for frame in range(frame, frame + frames):
+        if bomber:
+            # wander and drop a bomb now and then
+            if frame % 90 == 0:
+                world.player.move_left = random.random() < 0.5
+                world.player.move_right = not world.player.move_left
+                world.player.move_up = random.random() < 0.5
+                world.player.move_down = not world.player.move_up
+            if frame % 40 == 0:
+                world.try_place_bomb()
+        clock.tick()
+        world.step()
+
+def obstacle_bytes(world):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    world.seed_arena()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / max(1, len(world.obstacles))
+
+# methods that keep the entity lists up to date every frame
+UPKEEP = ('process_explosions', 'prune_explosions', 'collect_powerups')
+# entities parked in each list for the short and the long run; both are
+# past 256 so the loop indices are never cached small ints in one run only
+PADDING = (300, 1200)
+# allowed difference in mean churn per frame between the two runs (bytes)
+CHURN_SLACK = 64
+
+def measure_upkeep(world, churn):
+    """Wrap the upkeep methods so each call adds its transient bytes to churn[-1]."""
+    def wrap(fn):
+        def measured():
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            fn()
+            now, peak = tracemalloc.get_traced_memory()
+            churn[-1] += peak - max(before, now)
+        return measured
+    for name in UPKEEP:
+        setattr(world, name, wrap(getattr(world, name)))
+
+def bomber_run(frames, padding):
+    """Mean upkeep churn per frame, plus counts of what spawned and expired."""
+    random.seed(1)
+    clock = SimClock(1 / 60)
+    Project.time = clock
+    world = Project.World()
+    world.player.invincible = True
+    for _ in range(padding):
+        # never fade and never get picked up: they only make the lists long
+        e = Project.Explosion(0.0, 0.0, 1.0)
+        e.duration = float('inf')
+        world.explosions.append(e)
+        world.powerups.append(Project.PowerUp(1e6, 1e6, 0))
+    churn = []
+    events = {'bombs': 0, 'explosions': 0, 'faded': 0, 'powerups': 0, 'picked up': 0}
+    measure_upkeep(world, churn)
+    tracemalloc.start()
+    for frame in range(frames):
+        before = [set(map(id, items)) for items in (world.bombs, world.explosions, world.powerups)]
+        churn.append(0)
+        run_frames(world, clock, 1, bomber=True, frame=frame)
+        after = [set(map(id, items)) for items in (world.bombs, world.explosions, world.powerups)]
+        events['bombs'] += len(after[0] - before[0])
+        events['explosions'] += len(after[1] - before[1])
+        events['faded'] += len(before[1] - after[1])
+        events['powerups'] += len(after[2] - before[2])
+        events['picked up'] += len(before[2] - after[2])
+    tracemalloc.stop()
+    return sum(churn) / frames, max(churn), events
+
+def check(frames):
+    random.seed(1)
+    clock = SimClock(1 / 60)
+    Project.time = clock
+    world = Project.World()
+    print(f"obstacles: {len(world.obstacles)}, {obstacle_bytes(world):.1f} bytes each")
+
+    ok = True
+    results = []
+    for padding in PADDING:
+        mean, worst, events = bomber_run(frames, padding)
+        results.append(mean)
+        print(f"padding {padding:>4}: upkeep churn {mean:7.1f} B/frame mean, {worst} B worst; "
+              + ", ".join(f"{v} {k}" for k, v in events.items()))
+        if not all(events.values()):
+            print("  bombs, explosions or power-ups never ran inside the measured frames")
+            ok = False
+    growth = results[1] - results[0]
+    print(f"churn growth from {PADDING[0]} to {PADDING[1]} entities per list: {growth:.1f} B/frame "
+          f"(limit {CHURN_SLACK})")
+    return ok and growth <= CHURN_SLACK
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+    sys.exit(0 if check(args.frames) else 1)
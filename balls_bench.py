@@ -0,0 +1,151 @@
+"""
+Bouncing Balls benchmarks
+-------------------------
+scale       imports the Bouncing Balls script without opening a window,
+            spawns N balls for each N in --counts, runs a fixed number of
+            step() calls and reports steps/sec and peak memory per ball.
+            --render draws every step into an offscreen framebuffer.
+            Ball-ball collisions are turned off above
+            MAX_COLLISION_BALLS: at 1M balls the broadphase candidate
+            pairs run into hundreds of millions and exhaust memory.
+broadphase  times the uniform-grid pair search used by collide_balls
+            against the naive all-pairs check.
+
+Run: python balls_bench.py scale --counts 10 1000 100000 --steps 100
+     python balls_bench.py broadphase [--max-naive N]
+"""
+
+import argparse
+import importlib.util
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from spatial import CellIndex, naive_pairs
+
+BOX_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "Build The Amaging Box A1-T2.py")
+BOX = 600
+RADIUS = 4.0
+# largest count the scale runs collide; above it they are walls only
+MAX_COLLISION_BALLS = 100000
+
+def load_box():
+    """Fresh copy of the Bouncing Balls module (no window is created)."""
+    spec = importlib.util.spec_from_file_location("bouncing_balls", BOX_SCRIPT)
+    box = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(box)
+    box.stats.json_path = None  # the benchmark reports its own numbers
+    return box
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+# ----------------------------
+# Offscreen rendering
+# ----------------------------
+def offscreen_target(width, height):
+    from OpenGL.GL import (glGenFramebuffers, glBindFramebuffer, glGenRenderbuffers,
+                           glBindRenderbuffer, glRenderbufferStorage,
+                           glFramebufferRenderbuffer, GL_FRAMEBUFFER, GL_RENDERBUFFER,
+                           GL_RGBA8, GL_DEPTH_COMPONENT24, GL_COLOR_ATTACHMENT0,
+                           GL_DEPTH_ATTACHMENT)
+    from OpenGL.GLUT import (glutInit, glutInitDisplayMode, glutInitWindowSize,
+                             glutCreateWindow, glutHideWindow, GLUT_RGB, GLUT_DEPTH,
+                             GLUT_DOUBLE)
+    # GLUT still needs a (hidden) window to own the GL context
+    glutInit()
+    glutInitDisplayMode(GLUT_DEPTH | GLUT_DOUBLE | GLUT_RGB)
+    glutInitWindowSize(width, height)
+    glutCreateWindow(b"Bouncing Balls (offscreen)")
+    glutHideWindow()
+    fbo = glGenFramebuffers(1)
+    glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+    for fmt, attachment in ((GL_RGBA8, GL_COLOR_ATTACHMENT0),
+                            (GL_DEPTH_COMPONENT24, GL_DEPTH_ATTACHMENT)):
+        rb = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, fmt, width, height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, attachment, GL_RENDERBUFFER, rb)
+    return fbo
+
+# ----------------------------
+# Scenarios
+# ----------------------------
+def run_scenario(n, steps, render=False, collisions=True):
+    box = load_box()
+    box.collisions = collisions
+    # peak memory from setup plus one step; tracemalloc slows everything
+    # down, so the timed steps below run untraced
+    tracemalloc.start()
+    box.add_balls(np.random.uniform(0, box.WIN_WIDTH, n),
+                  np.random.uniform(0, box.WIN_HEIGHT, n))
+    box.step(box.FIXED_DT)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(steps):
+        box.step(box.FIXED_DT)
+        if render:
+            box.draw()
+    if render:
+        from OpenGL.GL import glFinish
+        glFinish()
+    elapsed = time.perf_counter() - start
+    return steps / elapsed, peak / n
+
+def scale(counts, steps, render, collisions):
+    if render:
+        offscreen_target(BOX, BOX)
+    # warm-up so one-off NumPy allocations don't land on the first row
+    run_scenario(10, 2, render, collisions)
+    if collisions and max(counts) > MAX_COLLISION_BALLS:
+        print(f"collisions off above {MAX_COLLISION_BALLS} balls (broadphase would exhaust memory)")
+    print(f"{'balls':>9}{'collide':>9}{'steps/s':>12}{'ball-steps/s':>15}{'peak B/ball':>13}")
+    for n in counts:
+        # keep total work roughly bounded for the huge counts
+        k = max(1, min(steps, steps * 10000 // n)) if n > 10000 else steps
+        collide = collisions and n <= MAX_COLLISION_BALLS
+        rate, per_ball = run_scenario(n, k, render, collide)
+        print(f"{n:>9}{'yes' if collide else 'no':>9}{rate:>12.1f}{rate * n:>15.3g}{per_ball:>13.1f}")
+
+def broadphase(counts, max_naive, repeat=3):
+    grid = CellIndex(2 * RADIUS)
+    print(f"{'balls':>9}{'pairs':>10}{'grid ms':>10}{'naive ms':>11}{'speedup':>9}")
+    for n in counts:
+        pos = np.random.uniform(0, BOX, (n, 2)).astype(np.float32)
+        t_grid, (i, _) = timed(lambda: grid.build(pos).pairs_within(2 * RADIUS), repeat)
+        if n <= max_naive:
+            t_naive, (ni, _) = timed(lambda: naive_pairs(pos, 2 * RADIUS, chunk=256), 1)
+            assert len(ni) == len(i), "broadphase missed pairs"
+            naive = f"{t_naive*1e3:>11.2f}{t_naive / t_grid:>8.1f}x"
+        else:
+            naive = f"{'-':>11}{'-':>9}"
+        print(f"{n:>9}{len(i):>10}{t_grid*1e3:>10.2f}{naive}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="mode", required=True)
+    p_scale = sub.add_parser("scale", help="steps/sec and memory per ball")
+    p_scale.add_argument("--counts", type=int, nargs="+",
+                         default=[10, 100, 1000, 10000, 100000, 1000000])
+    p_scale.add_argument("--steps", type=int, default=200)
+    p_scale.add_argument("--render", action="store_true",
+                         help="also draw each step into an offscreen framebuffer")
+    p_scale.add_argument("--no-collisions", action="store_true",
+                         help="walls only, skip ball-ball collisions")
+    p_bp = sub.add_parser("broadphase", help="grid vs naive pair search")
+    p_bp.add_argument("--max-naive", type=int, default=16000,
+                      help="largest ball count to run the O(n^2) check on")
+    args = parser.parse_args()
+    if args.mode == "scale":
+        scale(args.counts, args.steps, args.render, not args.no_collisions)
+    else:
+        broadphase([500, 1000, 2000, 4000, 8000, 16000, 32000, 64000], args.max_naive)
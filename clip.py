@@ -0,0 +1,125 @@
+"""
+Line clipping for batches of segments
+-------------------------------------
+- Cohen-Sutherland against an axis-aligned window
+- Cyrus-Beck against any convex polygon window
+- window_margin: how far points are inside either window, for culling
+  whole shapes before they are rasterised
+
+Segments are an (n, 4) array of x1, y1, x2, y2. Each clipper returns the
+clipped segments together with a boolean mask of the ones that are still
+visible, so only those need to reach the rasteriser. All the work is done
+as array operations over the whole batch.
+"""
+
+import numpy as np
+
+INSIDE, LEFT, RIGHT, BOTTOM, TOP = 0, 1, 2, 4, 8
+
+def outcodes(x, y, xmin, ymin, xmax, ymax):
+    code = np.zeros(np.shape(x), dtype=np.uint8)
+    code |= np.where(x < xmin, LEFT, INSIDE).astype(np.uint8)
+    code |= np.where(x > xmax, RIGHT, INSIDE).astype(np.uint8)
+    code |= np.where(y < ymin, BOTTOM, INSIDE).astype(np.uint8)
+    code |= np.where(y > ymax, TOP, INSIDE).astype(np.uint8)
+    return code
+
+def cohen_sutherland(segs, xmin, ymin, xmax, ymax):
+    segs = np.array(segs, dtype=np.float64).reshape(-1, 4)
+    c1 = outcodes(segs[:, 0], segs[:, 1], xmin, ymin, xmax, ymax)
+    c2 = outcodes(segs[:, 2], segs[:, 3], xmin, ymin, xmax, ymax)
+    visible = (c1 & c2) == 0
+    pending = visible & ((c1 | c2) != 0)
+    # whole batch trivially accepted or rejected: nothing left to intersect
+    if not pending.any():
+        return segs, visible
+    # each pass moves one outside endpoint onto a window edge; four edges
+    # means at most four passes per endpoint
+    for _ in range(8):
+        idx = np.flatnonzero(pending)
+        if len(idx) == 0:
+            break
+        s = segs[idx]
+        a, b = c1[idx], c2[idx]
+        first = a != 0
+        out = np.where(first, a, b)
+        x1, y1, x2, y2 = s[:, 0], s[:, 1], s[:, 2], s[:, 3]
+        dx, dy = x2 - x1, y2 - y1
+        x = np.empty(len(idx)); y = np.empty(len(idx))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            top = (out & TOP) != 0
+            bottom = ~top & ((out & BOTTOM) != 0)
+            right = ~top & ~bottom & ((out & RIGHT) != 0)
+            left = ~top & ~bottom & ~right
+            x[top] = (x1 + dx * (ymax - y1) / dy)[top]; y[top] = ymax
+            x[bottom] = (x1 + dx * (ymin - y1) / dy)[bottom]; y[bottom] = ymin
+            y[right] = (y1 + dy * (xmax - x1) / dx)[right]; x[right] = xmax
+            y[left] = (y1 + dy * (xmin - x1) / dx)[left]; x[left] = xmin
+        code = outcodes(x, y, xmin, ymin, xmax, ymax)
+        fi, se = idx[first], idx[~first]
+        segs[fi, 0], segs[fi, 1], c1[fi] = x[first], y[first], code[first]
+        segs[se, 2], segs[se, 3], c2[se] = x[~first], y[~first], code[~first]
+        rejected = (c1[idx] & c2[idx]) != 0
+        visible[idx[rejected]] = False
+        pending[idx] = ~rejected & ((c1[idx] | c2[idx]) != 0)
+    return segs, visible
+
+def _inward_normals(poly):
+    # inward edge normals, whatever the winding of the polygon
+    edges = np.roll(poly, -1, axis=0) - poly
+    area = np.sum(poly[:, 0] * np.roll(poly[:, 1], -1) - np.roll(poly[:, 0], -1) * poly[:, 1])
+    return np.stack([-edges[:, 1], edges[:, 0]], axis=1) * (1.0 if area > 0 else -1.0)
+
+def cyrus_beck_times(segs, polygon):
+    """Entry and exit parameters t_in, t_out along each segment (0 at
+    x1, y1 and 1 at x2, y2) for a convex polygon given as a list of (x, y),
+    plus the visible mask."""
+    segs = np.array(segs, dtype=np.float64).reshape(-1, 4)
+    poly = np.asarray(polygon, dtype=np.float64)
+    normals = _inward_normals(poly)
+    p0, d = segs[:, :2], segs[:, 2:] - segs[:, :2]
+    # num[i, k] >= 0 when p0 of segment i is inside edge k
+    num = np.einsum('ikj,kj->ik', p0[:, None, :] - poly[None, :, :], normals)
+    den = d @ normals.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = -num / den
+    entering = den > 0
+    leaving = den < 0
+    parallel_out = (den == 0) & (num < 0)
+    t_in = np.max(np.where(entering, t, 0.0), axis=1, initial=0.0)
+    t_out = np.min(np.where(leaving, t, 1.0), axis=1, initial=1.0)
+    visible = (t_in <= t_out) & ~parallel_out.any(axis=1)
+    return t_in, t_out, visible
+
+def cyrus_beck(segs, polygon):
+    """Clip segments against a convex polygon given as a list of (x, y)."""
+    segs = np.array(segs, dtype=np.float64).reshape(-1, 4)
+    t_in, t_out, visible = cyrus_beck_times(segs, polygon)
+    p0, d = segs[:, :2], segs[:, 2:] - segs[:, :2]
+    out = np.empty_like(segs)
+    out[:, :2] = p0 + d * t_in[:, None]
+    out[:, 2:] = p0 + d * t_out[:, None]
+    return out, visible
+
+def clip_segments(segs, rect=None, polygon=None):
+    """Clip against rect (xmin, ymin, xmax, ymax) or a convex polygon window
+    and return only the visible segments."""
+    if polygon is not None:
+        out, visible = cyrus_beck(segs, polygon)
+    else:
+        out, visible = cohen_sutherland(segs, *rect)
+    return out[visible]
+
+def window_margin(pts, rect=None, polygon=None):
+    """Signed distance from each (x, y) point to the nearest edge line of
+    the window: >= 0 inside, and outside at least as far out as -margin,
+    so anything within r of a point with margin < -r is outside too."""
+    pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    if polygon is None:
+        xmin, ymin, xmax, ymax = rect
+        polygon = [(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)]
+    poly = np.asarray(polygon, dtype=np.float64)
+    normals = _inward_normals(poly)
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    dist = np.einsum('ikj,kj->ik', pts[:, None, :] - poly[None, :, :], normals)
+    return dist.min(axis=1)
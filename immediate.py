@@ -0,0 +1,125 @@
+"""
+Batched immediate mode
+----------------------
+A stand-in for glBegin / glColor / glVertex / glEnd with the same call
+shapes. Nothing reaches GL while drawing: vertices are recorded into
+batches keyed by primitive type and state (point size, line width), and
+flush() submits each batch as one vertex-array draw.
+
+Strips, fans, loops and polygons are turned into plain GL_TRIANGLES,
+GL_LINES or GL_QUADS when end() is called, so primitives from many
+begin/end pairs can share one batch. Batches are drawn in the order they
+were first used, not in call order: flush() wherever drawing order
+matters (e.g. before changing blend state).
+
+The recorder counts the GL calls the immediate-mode version would have
+made against the ones actually issued; end_frame() turns that into
+calls saved per frame.
+
+    import immediate as im
+    im.begin(GL_TRIANGLE_FAN); im.color(1, 0, 0); im.vertex(0, 0, 0); ...; im.end()
+    im.flush()
+"""
+
+import numpy as np
+from OpenGL.GL import *
+
+def _fan(n):
+    return GL_TRIANGLES, [j for i in range(1, n - 1) for j in (0, i, i + 1)]
+
+def _triangle_strip(n):
+    # every other triangle is flipped to keep the winding of the strip
+    return GL_TRIANGLES, [j for i in range(n - 2)
+                          for j in ((i, i + 1, i + 2) if i % 2 == 0 else (i + 1, i, i + 2))]
+
+def _quad_strip(n):
+    return GL_QUADS, [j for i in range(0, n - 3, 2) for j in (i, i + 1, i + 3, i + 2)]
+
+def _line_strip(n):
+    return GL_LINES, [j for i in range(n - 1) for j in (i, i + 1)]
+
+def _line_loop(n):
+    mode, idx = _line_strip(n)
+    return mode, idx + [n - 1, 0] if n > 1 else idx
+
+# modes that cannot be concatenated and what they become
+EXPAND = {
+    GL_TRIANGLE_FAN: _fan,
+    GL_POLYGON: _fan,
+    GL_TRIANGLE_STRIP: _triangle_strip,
+    GL_QUAD_STRIP: _quad_strip,
+    GL_LINE_STRIP: _line_strip,
+    GL_LINE_LOOP: _line_loop,
+}
+
+class Recorder:
+    def __init__(self):
+        self.batches = {}   # (mode, point size, line width) -> [(x, y, z, r, g, b, a)]
+        self.pending = None
+        self.rgba = (1.0, 1.0, 1.0, 1.0)
+        self.immediate_calls = 0
+        self.issued_calls = 0
+        self.saved_last_frame = 0
+
+    def begin(self, mode, point_size=None, line_width=None):
+        self.mode = mode
+        self.state = (point_size, line_width)
+        self.pending = []
+        self.immediate_calls += 1
+
+    def color(self, r, g, b, a=1.0):
+        self.rgba = (r, g, b, a)
+        self.immediate_calls += 1
+
+    def vertex(self, x, y, z=0.0):
+        self.pending.append((x, y, z) + self.rgba)
+        self.immediate_calls += 1
+
+    def end(self):
+        verts, self.pending = self.pending, None
+        self.immediate_calls += 1
+        mode = self.mode
+        expand = EXPAND.get(mode)
+        if expand:
+            mode, idx = expand(len(verts))
+            verts = [verts[i] for i in idx]
+        if verts:
+            self.batches.setdefault((mode,) + self.state, []).extend(verts)
+
+    def flush(self):
+        """Draw and clear everything recorded so far."""
+        if not self.batches:
+            return
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        calls = 2
+        for (mode, point_size, line_width), verts in self.batches.items():
+            data = np.array(verts, dtype=np.float32)
+            pos = np.ascontiguousarray(data[:, :3])
+            rgba = np.ascontiguousarray(data[:, 3:])
+            if point_size is not None or line_width is not None:
+                glPushAttrib(GL_POINT_BIT | GL_LINE_BIT)
+                if point_size is not None: glPointSize(point_size)
+                if line_width is not None: glLineWidth(line_width)
+                calls += 1 + (point_size is not None) + (line_width is not None)
+            glVertexPointer(3, GL_FLOAT, 0, pos)
+            glColorPointer(4, GL_FLOAT, 0, rgba)
+            glDrawArrays(mode, 0, len(pos))
+            calls += 3
+            if point_size is not None or line_width is not None:
+                glPopAttrib()
+                calls += 1
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        self.issued_calls += calls + 2
+        self.batches.clear()
+
+    def end_frame(self):
+        """Close the frame's books; returns GL calls saved this frame."""
+        self.saved_last_frame = self.immediate_calls - self.issued_calls
+        self.immediate_calls = self.issued_calls = 0
+        return self.saved_last_frame
+
+recorder = Recorder()
+begin, color, vertex, end, flush = (recorder.begin, recorder.color, recorder.vertex,
+                                    recorder.end, recorder.flush)
@@ -0,0 +1,151 @@
+"""
+Pre-tessellated meshes
+----------------------
+Spheres, cubes and cylinders as GL_TRIANGLES vertex/normal arrays, built
+with NumPy once per resolution and cached, then drawn straight from the
+arrays with glDrawArrays. They stand in for glutSolidSphere,
+glutSolidCube and gluCylinder, which tessellate again on every call.
+
+- sphere(slices, stacks): unit radius, like glutSolidSphere(1, ...)
+- cube(): unit edge, centred, like glutSolidCube(1)
+- cylinder(base, top, height, slices, stacks): open tube along +z, like
+  gluCylinder
+
+Mesh.draw_instances draws many copies with different positions, scales
+and colours. Instances are merged on the CPU into one array and one draw
+call; large batches are merged in chunks of at most BATCH_VERTS vertices,
+one draw call per chunk. Under a non-uniform scale the normals are
+divided by the scale (the inverse transpose of a diagonal matrix) and
+renormalised, so stretched copies still light correctly.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from OpenGL.GL import *
+
+# most vertices merged into one instanced draw
+BATCH_VERTS = 200000
+
+class Mesh:
+    def __init__(self, verts, normals):
+        self.verts = np.ascontiguousarray(verts, dtype=np.float32)
+        self.normals = np.ascontiguousarray(normals, dtype=np.float32)
+        self.count = len(self.verts)
+        # grown on demand and reused by draw_instances
+        self.batch_verts = np.zeros((0, 3), dtype=np.float32)
+        self.batch_normals = np.zeros((0, 3), dtype=np.float32)
+        self.scaled_normals = np.zeros((0, 3), dtype=np.float32)
+
+    def bind(self, verts=None, normals=None):
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.verts if verts is None else verts)
+        glNormalPointer(GL_FLOAT, 0, self.normals if normals is None else normals)
+
+    def unbind(self):
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def draw(self):
+        self.bind()
+        glDrawArrays(GL_TRIANGLES, 0, self.count)
+        self.unbind()
+
+    def draw_instances(self, pos, scale=1.0, color=None):
+        """One copy per row of pos (m, 3). scale is a scalar, (m,) or (m, 3);
+        color is None (keep the current colour), (3,) or (m, 3)."""
+        pos = np.asarray(pos, dtype=np.float32).reshape(-1, 3)
+        m = len(pos)
+        if m == 0:
+            return
+        scale = np.asarray(scale, dtype=np.float32)
+        scale = np.broadcast_to(scale if scale.ndim == 2 else scale.reshape(-1, 1), (m, 3))
+        if color is not None:
+            color = np.asarray(color, dtype=np.float32)
+            if color.ndim == 1:
+                glColor3f(*color.tolist())
+                color = None
+        # instances per merged draw call, at least one for very large meshes
+        chunk = max(1, BATCH_VERTS // self.count)
+        for i in range(0, m, chunk):
+            self._draw_merged(pos[i:i + chunk], scale[i:i + chunk],
+                              None if color is None else color[i:i + chunk])
+
+    def _draw_merged(self, pos, scale, color):
+        m, n = len(pos), self.count
+        if len(self.batch_verts) < m * n:
+            self.batch_verts = np.empty((m * n, 3), dtype=np.float32)
+            self.batch_normals = np.tile(self.normals, (m, 1))
+        verts = self.batch_verts[:m * n].reshape(m, n, 3)
+        np.multiply(self.verts[None], scale[:, None, :], out=verts)
+        verts += pos[:, None, :]
+        normals = self.batch_normals
+        if not np.all((scale == scale[:, :1]) & (scale > 0)):
+            # non-uniform (or mirroring) scale: normals go through the
+            # inverse transpose, i.e. divided by the scale, then renormalised
+            if len(self.scaled_normals) < m * n:
+                self.scaled_normals = np.empty((m * n, 3), dtype=np.float32)
+            normals = self.scaled_normals
+            scaled = normals[:m * n].reshape(m, n, 3)
+            np.divide(self.normals[None], scale[:, None, :], out=scaled)
+            scaled /= np.linalg.norm(scaled, axis=2, keepdims=True)
+        self.bind(self.batch_verts, normals)
+        if color is not None:
+            glEnableClientState(GL_COLOR_ARRAY)
+            glColorPointer(3, GL_FLOAT, 0, np.ascontiguousarray(np.repeat(color, n, axis=0)))
+        glDrawArrays(GL_TRIANGLES, 0, m * n)
+        if color is not None:
+            glDisableClientState(GL_COLOR_ARRAY)
+        self.unbind()
+
+def _grid_triangles(grid):
+    # (rows + 1, cols + 1, 3) grid of points -> two triangles per cell
+    a, b = grid[:-1, :-1], grid[1:, :-1]
+    c, d = grid[1:, 1:], grid[:-1, 1:]
+    return np.stack([a, b, c, a, c, d], axis=2).reshape(-1, 3)
+
+@lru_cache(maxsize=None)
+def sphere(slices=16, stacks=16):
+    theta = np.linspace(0, 2*np.pi, slices + 1)
+    phi = np.linspace(0, np.pi, stacks + 1)[:, None]
+    grid = np.stack([np.sin(phi) * np.cos(theta),
+                     np.sin(phi) * np.sin(theta),
+                     np.broadcast_to(np.cos(phi), (stacks + 1, slices + 1))], axis=2)
+    verts = _grid_triangles(grid)
+    # unit sphere: each vertex is its own normal
+    return Mesh(verts, verts)
+
+@lru_cache(maxsize=None)
+def cube():
+    verts, normals = [], []
+    for axis in range(3):
+        u, v = (axis + 1) % 3, (axis + 2) % 3
+        for sign in (-0.5, 0.5):
+            corners = []
+            for cu, cv in ((-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5)):
+                p = [0.0, 0.0, 0.0]
+                p[axis], p[u], p[v] = sign, cu, cv
+                corners.append(p)
+            if sign < 0:
+                corners.reverse()  # keep every face counter-clockwise from outside
+            verts += [corners[i] for i in (0, 1, 2, 0, 2, 3)]
+            n = [0.0, 0.0, 0.0]
+            n[axis] = 1.0 if sign > 0 else -1.0
+            normals += [n] * 6
+    return Mesh(verts, normals)
+
+@lru_cache(maxsize=None)
+def cylinder(base, top, height, slices=12, stacks=1):
+    theta = np.linspace(0, 2*np.pi, slices + 1)
+    z = np.linspace(0, height, stacks + 1)[:, None]
+    r = base + (top - base) * z / height
+    grid = np.stack([r * np.cos(theta), r * np.sin(theta),
+                     np.broadcast_to(z, (stacks + 1, slices + 1))], axis=2)
+    # side normals lean along z by the taper of the tube
+    ngrid = np.stack([np.broadcast_to(np.cos(theta), (stacks + 1, slices + 1)),
+                      np.broadcast_to(np.sin(theta), (stacks + 1, slices + 1)),
+                      np.full((stacks + 1, slices + 1), (base - top) / height)], axis=2)
+    ngrid /= np.linalg.norm(ngrid, axis=2, keepdims=True)
+    # rows from the top down so the triangles face outwards
+    return Mesh(_grid_triangles(grid[::-1]), _grid_triangles(ngrid[::-1]))
@@ -0,0 +1,206 @@
+"""
+Raster algorithms shared by the lab scripts
+-------------------------------------------
+- Midpoint line drawing in any direction through zone (8-way) conversion
+- Midpoint circle using 8-way symmetry
+- Midpoint ellipse using 4-way symmetry
+
+Circles and ellipses are returned as horizontal spans instead of single
+points: an int array of rows (y, x0, x1), both ends inclusive. The midpoint
+loop only walks one octant/quadrant in Python; mirroring and grouping into
+spans is done with NumPy, so the caller never pays per-pixel Python cost.
+
+Spans pay off for filled shapes and for large outlines. A small outline
+has only a few pixels per step, and there the fixed cost of the NumPy calls
+is more than plotting points one at a time: raster_bench.py shows outlines
+breaking even around r = 128. Small outlines that are redrawn every frame
+are best rasterised once and cached.
+"""
+
+import numpy as np
+
+# ----------------------------
+# Lines (zone based midpoint)
+# ----------------------------
+def zone_of_line(x1, y1, x2, y2):
+    dx, dy = x2 - x1, y2 - y1
+    if abs(dx) >= abs(dy):
+        if dx >= 0 and dy >= 0: return 0
+        if dx < 0 and dy >= 0: return 3
+        if dx < 0 and dy < 0: return 4
+        return 7
+    else:
+        if dx >= 0 and dy >= 0: return 1
+        if dx < 0 and dy >= 0: return 2
+        if dx < 0 and dy < 0: return 5
+        return 6
+
+def to_zone0(x, y, zone):
+    ops = [lambda x, y: (x, y),
+           lambda x, y: (y, x),
+           lambda x, y: (y, -x),
+           lambda x, y: (-x, y),
+           lambda x, y: (-x, -y),
+           lambda x, y: (-y, -x),
+           lambda x, y: (-y, x),
+           lambda x, y: (x, -y)]
+    return ops[zone](x, y)
+
+def from_zone0(x, y, zone):
+    ops = [lambda x, y: (x, y),
+           lambda x, y: (y, x),
+           lambda x, y: (-y, x),
+           lambda x, y: (-x, y),
+           lambda x, y: (-x, -y),
+           lambda x, y: (-y, -x),
+           lambda x, y: (y, -x),
+           lambda x, y: (x, -y)]
+    return ops[zone](x, y)
+
+def line_points(x1, y1, x2, y2):
+    """Pixels of the midpoint line from (x1, y1) to (x2, y2) as a list of (x, y)."""
+    zone = zone_of_line(x1, y1, x2, y2)
+    tx1, ty1 = to_zone0(x1, y1, zone)
+    tx2, ty2 = to_zone0(x2, y2, zone)
+    if tx1 > tx2:
+        tx1, ty1, tx2, ty2 = tx2, ty2, tx1, ty1
+    dx, dy = tx2 - tx1, ty2 - ty1
+    d = 2*dy - dx
+    incE, incNE = 2*dy, 2*(dy-dx)
+    y = ty1
+    pts = []
+    for x in range(tx1, tx2+1):
+        pts.append(from_zone0(x, y, zone))
+        if d < 0:
+            d += incE
+        else:
+            d += incNE
+            y += 1
+    return pts
+
+# ----------------------------
+# Circles & ellipses as spans
+# ----------------------------
+def _circle_octant(r):
+    # Midpoint circle, octant from (0, r) to the 45 degree diagonal
+    xs, ys = [], []
+    x, y, d = 0, r, 1 - r
+    while x <= y:
+        xs.append(x); ys.append(y)
+        if d < 0:
+            d += 2*x + 3
+        else:
+            d += 2*(x - y) + 5
+            y -= 1
+        x += 1
+    return np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64)
+
+def _ellipse_quadrant(a, b):
+    # Midpoint ellipse (integer decision variables scaled by 4), first quadrant
+    xs, ys = [], []
+    a2, b2 = a*a, b*b
+    x, y = 0, b
+    # region 1: slope magnitude < 1, step in x
+    d1 = 4*b2 - 4*a2*b + a2
+    while 2*b2*x < 2*a2*y:
+        xs.append(x); ys.append(y)
+        if d1 < 0:
+            d1 += 4*b2*(2*x + 3)
+        else:
+            d1 += 4*b2*(2*x + 3) + 4*a2*(-2*y + 2)
+            y -= 1
+        x += 1
+    # region 2: slope magnitude >= 1, step in y
+    d2 = b2*(2*x + 1)**2 + 4*a2*(y - 1)**2 - 4*a2*b2
+    while y >= 0:
+        xs.append(x); ys.append(y)
+        if d2 > 0:
+            d2 += 4*a2*(-2*y + 3)
+        else:
+            d2 += 4*b2*(2*x + 2) + 4*a2*(-2*y + 3)
+            x += 1
+        y -= 1
+    return np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64)
+
+def _quadrant_spans(cx, cy, qx, qy, filled):
+    # qx, qy walk the first-quadrant arc from (0, b) to (a, 0): y never goes
+    # up and x never goes down, so each row is one run of points whose first
+    # and last x are the span ends. Rows are mirrored into all four
+    # quadrants; the y = 0 row and the x = 0 column are emitted once
+    first = np.flatnonzero(np.concatenate([[True], qy[1:] != qy[:-1]]))
+    rows = qy[first]
+    lo = np.zeros(len(rows), dtype=np.int64) if filled else qx[first]
+    hi = qx[np.concatenate([first[1:], [len(qy)]]) - 1]
+    # rows come out descending: the lower half keeps that order, the upper
+    # half is reversed, so the spans are sorted by y without a sort
+    down = rows > 0
+    ys = np.concatenate([cy - rows[down], cy + rows[::-1]])
+    lo = np.concatenate([lo[down], lo[::-1]])
+    hi = np.concatenate([hi[down], hi[::-1]])
+    joined = lo == 0
+    # right then left span of every row; rows touching x = 0 are one span
+    spans = np.empty((len(ys), 2, 3), dtype=np.int64)
+    spans[:, :, 0] = ys[:, None]
+    spans[:, 0, 1] = np.where(joined, cx - hi, cx + lo)
+    spans[:, 0, 2] = cx + hi
+    spans[:, 1, 1] = cx - hi
+    spans[:, 1, 2] = cx - lo
+    return spans[np.stack([np.ones(len(ys), dtype=bool), ~joined], axis=1)]
+
+def circle_spans(cx, cy, r, filled=False):
+    """Midpoint circle as (y, x0, x1) spans; filled gives one span per row."""
+    if r <= 0:
+        return np.array([[cy, cx, cx]], dtype=np.int64)
+    ox, oy = _circle_octant(r)
+    # 8-way symmetry: the swapped octant, walked backwards, completes the
+    # first-quadrant arc
+    qx = np.concatenate([ox, oy[::-1]])
+    qy = np.concatenate([oy, ox[::-1]])
+    return _quadrant_spans(cx, cy, qx, qy, filled)
+
+def ellipse_spans(cx, cy, a, b, filled=False):
+    """Midpoint ellipse with radii a (x) and b (y) as (y, x0, x1) spans."""
+    if a <= 0 or b <= 0:
+        return np.array([[cy, cx - max(a, 0), cx + max(a, 0)]], dtype=np.int64)
+    qx, qy = _ellipse_quadrant(a, b)
+    return _quadrant_spans(cx, cy, qx, qy, filled)
+
+# ----------------------------
+# Span consumers
+# ----------------------------
+def fill_spans(buf, spans, value):
+    """Write spans straight into a 2D buffer indexed [y, x], clipped to it."""
+    h, w = buf.shape[:2]
+    spans = spans[(spans[:, 0] >= 0) & (spans[:, 0] < h)]
+    x0 = np.clip(spans[:, 1], 0, w)
+    x1 = np.clip(spans[:, 2] + 1, 0, w)
+    keep = x0 < x1
+    spans, x0, x1 = spans[keep], x0[keep], x1[keep]
+    if (x1 - x0).sum() <= 4 * len(spans):
+        # outlines are mostly 1-2 pixel spans: scatter them in one go
+        pts = spans_to_points(np.stack([spans[:, 0], x0, x1 - 1], axis=1)).astype(np.intp)
+        buf[pts[:, 1], pts[:, 0]] = value
+        return buf
+    for y, a, b in zip(spans[:, 0].tolist(), x0.tolist(), x1.tolist()):
+        buf[y, a:b] = value
+    return buf
+
+def span_pixel_count(spans):
+    return int((spans[:, 2] - spans[:, 1] + 1).sum())
+
+def spans_to_points(spans):
+    """Expand spans into an (n, 2) float32 array of pixel centres."""
+    lengths = spans[:, 2] - spans[:, 1] + 1
+    ys = np.repeat(spans[:, 0], lengths)
+    starts = np.repeat(spans[:, 1] - np.cumsum(lengths) + lengths, lengths)
+    xs = starts + np.arange(lengths.sum())
+    return np.stack([xs, ys], axis=1).astype(np.float32)
+
+def spans_to_lines(spans):
+    """Spans as GL_LINES vertices covering each pixel row from edge to edge."""
+    verts = np.empty((len(spans) * 2, 2), dtype=np.float32)
+    verts[0::2, 0] = spans[:, 1]
+    verts[1::2, 0] = spans[:, 2] + 1
+    verts[0::2, 1] = spans[:, 0] + 0.5
+    verts[1::2, 1] = spans[:, 0] + 0.5
+    return verts
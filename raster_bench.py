@@ -0,0 +1,107 @@
+"""
+Throughput benchmark for raster.py
+----------------------------------
+Compares the span-based circle/ellipse rasterisers against per-point
+baselines (8-way symmetry for circles, 4-way for ellipses) that write one
+pixel at a time, for outline and filled shapes at several radii. The
+per-point filled baselines are skipped above r = 128, where they take
+seconds. Run: python raster_bench.py [--repeat N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import raster
+
+BUF_W, BUF_H = 1024, 1024
+
+def per_point_circle(buf, cx, cy, r, value):
+    # Textbook version: plot each of the eight symmetric points separately
+    x, y, d = 0, r, 1 - r
+    while x <= y:
+        for px, py in ((x, y), (y, x), (-x, y), (-y, x),
+                       (x, -y), (y, -x), (-x, -y), (-y, -x)):
+            buf[cy + py, cx + px] = value
+        if d < 0:
+            d += 2*x + 3
+        else:
+            d += 2*(x - y) + 5
+            y -= 1
+        x += 1
+
+def per_point_filled_circle(buf, cx, cy, r, value):
+    for py in range(-r, r + 1):
+        for px in range(-r, r + 1):
+            if px*px + py*py <= r*r + r:
+                buf[cy + py, cx + px] = value
+
+def per_point_ellipse(buf, cx, cy, a, b, value):
+    # Same midpoint ellipse as raster.py, plotting the four symmetric points
+    # of every step separately
+    def plot4(x, y):
+        for px, py in ((x, y), (-x, y), (x, -y), (-x, -y)):
+            buf[cy + py, cx + px] = value
+    a2, b2 = a*a, b*b
+    x, y = 0, b
+    d1 = 4*b2 - 4*a2*b + a2
+    while 2*b2*x < 2*a2*y:
+        plot4(x, y)
+        if d1 < 0:
+            d1 += 4*b2*(2*x + 3)
+        else:
+            d1 += 4*b2*(2*x + 3) + 4*a2*(-2*y + 2)
+            y -= 1
+        x += 1
+    d2 = b2*(2*x + 1)**2 + 4*a2*(y - 1)**2 - 4*a2*b2
+    while y >= 0:
+        plot4(x, y)
+        if d2 > 0:
+            d2 += 4*a2*(-2*y + 3)
+        else:
+            d2 += 4*b2*(2*x + 2) + 4*a2*(-2*y + 3)
+            x += 1
+        y -= 1
+
+def per_point_filled_ellipse(buf, cx, cy, a, b, value):
+    for py in range(-b, b + 1):
+        for px in range(-a, a + 1):
+            if b*b*px*px + a*a*py*py <= a*a*b*b:
+                buf[cy + py, cx + px] = value
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def run(repeat):
+    buf = np.zeros((BUF_H, BUF_W), dtype=np.uint8)
+    cx, cy = BUF_W // 2, BUF_H // 2
+    print(f"{'shape':<18}{'radius':>8}{'pixels':>10}{'span us':>12}{'point us':>12}{'Mpix/s':>10}")
+    for r in (8, 32, 128, 500):
+        cases = [
+            ("circle", lambda: raster.fill_spans(buf, raster.circle_spans(cx, cy, r), 1),
+             lambda: per_point_circle(buf, cx, cy, r, 1), raster.circle_spans(cx, cy, r)),
+            ("filled circle", lambda: raster.fill_spans(buf, raster.circle_spans(cx, cy, r, True), 1),
+             (lambda: per_point_filled_circle(buf, cx, cy, r, 1)) if r <= 128 else None,
+             raster.circle_spans(cx, cy, r, True)),
+            ("ellipse", lambda: raster.fill_spans(buf, raster.ellipse_spans(cx, cy, r, r // 2 + 1), 1),
+             lambda: per_point_ellipse(buf, cx, cy, r, r // 2 + 1, 1),
+             raster.ellipse_spans(cx, cy, r, r // 2 + 1)),
+            ("filled ellipse", lambda: raster.fill_spans(buf, raster.ellipse_spans(cx, cy, r, r // 2 + 1, True), 1),
+             (lambda: per_point_filled_ellipse(buf, cx, cy, r, r // 2 + 1, 1)) if r <= 128 else None,
+             raster.ellipse_spans(cx, cy, r, r // 2 + 1, True)),
+        ]
+        for name, span_fn, point_fn, spans in cases:
+            pixels = raster.span_pixel_count(spans)
+            t_span = timed(span_fn, repeat)
+            t_point = timed(point_fn, max(1, repeat // 10)) if point_fn else float('nan')
+            print(f"{name:<18}{r:>8}{pixels:>10}{t_span*1e6:>12.1f}{t_point*1e6:>12.1f}"
+                  f"{pixels / t_span / 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    run(parser.parse_args().repeat)
@@ -0,0 +1,149 @@
+"""
+Enemy Down bot-play benchmark
+-----------------------------
+Imports the Enemy Down script without opening a window and lets a bot
+play it headless, as fast as possible, for a fixed number of frames:
+
+spin  cheat mode: the hero spins and fires continuously
+auto  auto mode: fires a homing shot at the nearest unmarked foe every
+      --fire-every frames
+
+A finished game is reset straight away (keeping the bot's settings) so
+every run covers the full frame count. Reports frames/sec, average live
+entity counts and the time spent in each part of the update, then times
+Foes.nearest_unmarked against the per-foe Python scan auto-aim used
+before the foes became arrays.
+
+Run: python shooter_bench.py --bot spin --frames 5000
+     python shooter_bench.py --bot auto --horde --frames 2000
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import time
+from collections import defaultdict
+
+GAME_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Enemy down A3.py")
+
+def load_game():
+    """Fresh copy of the Enemy Down module (no window is created)."""
+    spec = importlib.util.spec_from_file_location("enemy_down", GAME_SCRIPT)
+    game = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(game)
+    return game
+
+# ----------------------------
+# Per-function timing
+# ----------------------------
+TIMED_FUNCTIONS = ['simulate', 'update_game', 'fire']
+TIMED_METHODS = {
+    'Bullets': ['add', 'update', 'expire'],
+    'Foes': ['update', 'touching', 'respawn', 'nearest_unmarked'],
+    'CellIndex': ['build', 'query'],
+    'SparkPool': ['emit_many', 'update'],
+}
+
+def timed(fn, name, totals, calls):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            totals[name] += time.perf_counter() - start
+            calls[name] += 1
+    return wrapper
+
+def instrument(game):
+    """Wrap the update path of a loaded game; returns (totals, calls)."""
+    totals, calls = defaultdict(float), defaultdict(int)
+    for name in TIMED_FUNCTIONS:
+        setattr(game, name, timed(getattr(game, name), name, totals, calls))
+    for cls_name, methods in TIMED_METHODS.items():
+        cls = getattr(game, cls_name)
+        for name in methods:
+            label = f"{cls_name}.{name}"
+            setattr(cls, name, timed(getattr(cls, name), label, totals, calls))
+    return totals, calls
+
+# ----------------------------
+# Auto-aim
+# ----------------------------
+def linear_scan_nearest(foes, x, z):
+    # the pre-array auto-aim: one Python step per foe
+    best, best_d = None, float('inf')
+    for i, ((fx, _, fz), marked) in enumerate(zip(foes.pos.tolist(), foes.marked.tolist())):
+        if not marked:
+            d = (fx - x)**2 + (fz - z)**2
+            if d < best_d:
+                best, best_d = i, d
+    return best
+
+def aim_bench(game, repeat=200):
+    foes, (x, _, z) = game.foes, game.hero_position
+    assert foes.nearest_unmarked(x, z) == linear_scan_nearest(foes, x, z)
+    rows = []
+    for name, fn in (("nearest_unmarked", foes.nearest_unmarked),
+                     ("linear scan", lambda x, z: linear_scan_nearest(foes, x, z))):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(x, z)
+        rows.append(f"{name} {(time.perf_counter() - start) * 1e6 / repeat:.1f} us")
+    print(f"aim over {foes.count} foes: " + " vs ".join(rows))
+
+# ----------------------------
+# Bots
+# ----------------------------
+def setup_bot(game, bot):
+    game.cheat_mode = bot == 'spin'
+    game.auto_mode = bot == 'auto'
+
+def run(bot, frames, dt, horde, fire_every, profile):
+    game = load_game()
+    totals, calls = instrument(game) if profile else ({}, {})
+    if horde:
+        game.set_horde(True)
+    setup_bot(game, bot)
+    games, kills = 1, 0
+    bullets = sparks = 0
+    # update_game prints a line on every game over
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for frame in range(frames):
+            if bot == 'auto' and frame % fire_every == 0:
+                game.fire()
+            game.simulate(dt)
+            bullets += game.ammo.count
+            sparks += game.sparks.count()
+            if game.end_flag:
+                kills += game.score
+                games += 1
+                game.reset()
+                setup_bot(game, bot)
+        elapsed = time.perf_counter() - start
+    kills += game.score
+    print(f"bot={bot} horde={horde} foes={game.foes.count} frames={frames} dt={dt:.4f}")
+    print(f"{frames / elapsed:.1f} frames/s ({elapsed * 1e3 / frames:.3f} ms/frame)")
+    print(f"games={games} kills={kills} avg bullets={bullets / frames:.1f} "
+          f"avg sparks={sparks / frames:.1f}")
+    if profile:
+        print(f"{'function':<26}{'calls':>9}{'total ms':>11}{'ms/frame':>10}{'% frame':>9}")
+        for name, total in sorted(totals.items(), key=lambda kv: -kv[1]):
+            print(f"{name:<26}{calls[name]:>9}{total * 1e3:>11.1f}"
+                  f"{total * 1e3 / frames:>10.4f}{100 * total / elapsed:>8.1f}%")
+    aim_bench(game)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bot", choices=["spin", "auto"], default="spin")
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--dt", type=float, default=1 / 60, help="simulated seconds per frame")
+    parser.add_argument("--horde", action="store_true", help="play in horde mode")
+    parser.add_argument("--fire-every", type=int, default=10,
+                        help="frames between shots for the auto bot")
+    parser.add_argument("--no-profile", action="store_true",
+                        help="skip the per-function timers (they add overhead)")
+    args = parser.parse_args()
+    run(args.bot, args.frames, args.dt, args.horde, args.fire_every, not args.no_profile)
@@ -0,0 +1,91 @@
+"""
+Spatial indexes for 2D points
+-----------------------------
+- CellIndex: points bucketed into square cells (found by sorting cell
+  keys), so neighbour searches only look at the 3x3 block of cells around
+  each point. The cell size must be at least the search radius. Pair
+  searches work on whole arrays with no per-point Python loop.
+"""
+
+import numpy as np
+
+# (0, 0) plus half of the surrounding ring: enough to see every pair once
+HALF_NEIGHBOURS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+ALL_NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+class CellIndex:
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+
+    def build(self, pts):
+        """Index an (n, 2) array of points; returns self for chaining."""
+        self.pts = pts
+        cells = np.floor(pts / self.cell_size).astype(np.int64)
+        if len(cells):
+            self.origin = cells.min(axis=0) - 1
+            cells -= self.origin
+            self.stride = int(cells[:, 1].max()) + 3
+        else:
+            self.origin = np.zeros(2, dtype=np.int64)
+            self.stride = 3
+        self.cells = cells
+        keys = cells[:, 0] * self.stride + cells[:, 1]
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.order]
+        return self
+
+    def _gather(self, query_ids, keys):
+        # every (query, indexed point) combination sharing a cell key
+        lo = np.searchsorted(self.sorted_keys, keys, 'left')
+        hi = np.searchsorted(self.sorted_keys, keys, 'right')
+        counts = hi - lo
+        total = int(counts.sum())
+        qi = np.repeat(query_ids, counts)
+        step = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return qi, self.order[np.repeat(lo, counts) + step]
+
+    def pairs_within(self, radius):
+        """Pairs (i, j), i != j, of indexed points closer than radius.
+        Each pair appears once."""
+        n = len(self.pts)
+        ids = np.arange(n)
+        qs, js = [], []
+        for dx, dy in HALF_NEIGHBOURS:
+            keys = (self.cells[:, 0] + dx) * self.stride + self.cells[:, 1] + dy
+            qi, j = self._gather(ids, keys)
+            if dx == 0 and dy == 0:
+                keep = qi < j
+                qi, j = qi[keep], j[keep]
+            qs.append(qi); js.append(j)
+        return _within(self.pts, self.pts, np.concatenate(qs), np.concatenate(js), radius)
+
+    def query(self, pts, radius):
+        """Pairs (q, j): query point pts[q] closer than radius to indexed point j."""
+        cells = np.floor(pts / self.cell_size).astype(np.int64) - self.origin
+        ids = np.arange(len(pts))
+        qs, js = [], []
+        for dx, dy in ALL_NEIGHBOURS:
+            keys = (cells[:, 0] + dx) * self.stride + cells[:, 1] + dy
+            qi, j = self._gather(ids, keys)
+            qs.append(qi); js.append(j)
+        return _within(pts, self.pts, np.concatenate(qs), np.concatenate(js), radius)
+
+def _within(a, b, i, j, radius):
+    d = a[i] - b[j]
+    close = np.einsum('ij,ij->i', d, d) < radius * radius
+    return i[close], j[close]
+
+def naive_pairs(pts, radius, chunk=1024):
+    """All-pairs reference for pairs_within: O(n^2) distance checks."""
+    qs, js = [], []
+    r2 = radius * radius
+    for start in range(0, len(pts), chunk):
+        block = pts[start:start + chunk]
+        d = block[:, None, :] - pts[None, :, :]
+        qi, j = np.nonzero(np.einsum('ijk,ijk->ij', d, d) < r2)
+        qi += start
+        keep = qi < j
+        qs.append(qi[keep]); js.append(j[keep])
+    if not qs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(qs), np.concatenate(js)
@@ -0,0 +1,228 @@
+"""
+Frame-time telemetry for the GLUT programs
+------------------------------------------
+Each program creates one Telemetry and decorates its display and
+idle/timer callbacks with it:
+
+    stats = Telemetry("enemy_down")
+
+    @stats.display
+    def show(): ...
+
+    @stats.update
+    def idle(): ...
+
+Three things are recorded into fixed-size histograms:
+- interval: time between the starts of consecutive display calls
+- update: time spent in the idle/timer callback
+- render: time spent in the display callback (including the buffer swap)
+
+Histograms are HDR-style: log2 buckets, each split into linear
+sub-buckets, so every value keeps about 3% relative precision from
+microseconds to seconds in a few hundred counters.
+
+Environment:
+- TELEMETRY_OVERLAY=1  draw FPS and p99 frame time in the corner; the
+  display function calls stats.draw_overlay() just before swapping
+- TELEMETRY_JSON=path  where the JSON summary is written at exit
+  (default <name>.telemetry.json); TELEMETRY_JSON=0 turns it off
+
+freeglut's default is to call C exit() when the window is closed, which
+skips Python's atexit handlers. Each program sets
+GLUT_ACTION_ON_WINDOW_CLOSE to GLUT_ACTION_GLUTMAINLOOP_RETURNS and calls
+stats.close() after glutMainLoop; atexit is only the fallback.
+"""
+
+import atexit
+import functools
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+# named imports: the star import would shadow the platform module
+from OpenGL.GL import (glGetString, glGetIntegerv, glPushAttrib, glPopAttrib, glDisable,
+                       glMatrixMode, glPushMatrix, glPopMatrix, glLoadIdentity, glOrtho,
+                       glColor3f, GL_RENDERER, GL_VIEWPORT, GL_ENABLE_BIT, GL_CURRENT_BIT,
+                       GL_LIGHTING, GL_DEPTH_TEST, GL_TEXTURE_2D, GL_PROJECTION,
+                       GL_MODELVIEW)
+
+from text_cache import text_cache
+
+SUB_BITS = 6
+SUB = 1 << SUB_BITS      # linear sub-buckets in the first octave
+HALF = SUB // 2          # sub-buckets in every later octave
+MAX_US = 60 * 10**6      # one minute; longer values land in the top bucket
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+def _bucket(us):
+    shift = max(0, us.bit_length() - SUB_BITS)
+    return shift * HALF + (us >> shift)
+
+def _bucket_upper(index):
+    # largest value (us) that falls in a bucket
+    if index < SUB:
+        return index
+    shift = (index - SUB) // HALF + 1
+    return ((index - shift * HALF + 1) << shift) - 1
+
+class Histogram:
+    def __init__(self):
+        self.counts = np.zeros(_bucket(MAX_US) + 1, dtype=np.int64)
+        self.total = 0
+        self.sum_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def record(self, seconds):
+        us = min(MAX_US, max(0, int(seconds * 1e6)))
+        self.counts[_bucket(us)] += 1
+        self.total += 1
+        self.sum_us += us
+        self.min_us = us if self.min_us is None else min(self.min_us, us)
+        self.max_us = max(self.max_us, us)
+
+    def percentile(self, p):
+        """Upper edge of the bucket holding the p-th percentile, in seconds."""
+        if not self.total:
+            return 0.0
+        rank = max(1, int(np.ceil(self.total * p / 100.0)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(_bucket_upper(index), self.max_us) / 1e6
+
+    def summary(self):
+        if not self.total:
+            return {'count': 0}
+        used = np.flatnonzero(self.counts)
+        return {
+            'count': self.total,
+            'min_ms': self.min_us / 1e3,
+            'mean_ms': self.sum_us / self.total / 1e3,
+            'max_ms': self.max_us / 1e3,
+            'percentiles_ms': {str(p): self.percentile(p) * 1e3 for p in PERCENTILES},
+            # [bucket upper edge in us, count], enough to merge or re-plot runs
+            'buckets': [[_bucket_upper(i), int(self.counts[i])] for i in used.tolist()],
+        }
+
+class Telemetry:
+    def __init__(self, name, overlay=None, json_path=None):
+        self.name = name
+        self.interval = Histogram()
+        self.update_time = Histogram()
+        self.render_time = Histogram()
+        self.overlay = os.environ.get('TELEMETRY_OVERLAY') == '1' if overlay is None else overlay
+        if json_path is None:
+            json_path = os.environ.get('TELEMETRY_JSON', f"{name}.telemetry.json")
+        self.json_path = None if json_path == '0' else json_path
+        self.renderer = None
+        self.started = None
+        self.last_frame = None
+        self.closed = False
+        # FPS for the overlay, refreshed twice a second
+        self.fps = 0.0
+        self.fps_frames = 0
+        self.fps_since = None
+
+    def _start(self, now):
+        # first recorded frame: only programs that actually run get a JSON file
+        self.started = now
+        if self.json_path:
+            atexit.register(self.close)
+        try:
+            self.renderer = (glGetString(GL_RENDERER) or b'').decode(errors='replace')
+        except Exception:
+            self.renderer = None
+
+    def display(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            now = time.perf_counter()
+            if self.started is None:
+                self._start(now)
+            if self.last_frame is not None:
+                self.interval.record(now - self.last_frame)
+            self.last_frame = now
+            self._count_fps(now)
+            try:
+                return fn(*args)
+            finally:
+                self.render_time.record(time.perf_counter() - now)
+        return wrapper
+
+    def update(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.update_time.record(time.perf_counter() - start)
+        return wrapper
+
+    def _count_fps(self, now):
+        if self.fps_since is None:
+            self.fps_since = now
+        self.fps_frames += 1
+        if now - self.fps_since >= 0.5:
+            self.fps = self.fps_frames / (now - self.fps_since)
+            self.fps_frames, self.fps_since = 0, now
+
+    def draw_overlay(self):
+        """FPS and p99 frame interval in the top-left corner, if enabled."""
+        if not self.overlay:
+            return
+        _, _, w, h = glGetIntegerv(GL_VIEWPORT)
+        glPushAttrib(GL_ENABLE_BIT | GL_CURRENT_BIT)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_TEXTURE_2D)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, w, 0, h, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glColor3f(1, 1, 0)
+        # rounded so the text cache sees few distinct strings
+        p99 = self.interval.percentile(99) * 1e3
+        text_cache.draw(8, h - 16, f"{self.fps:.0f} fps  p99 {p99:.1f} ms")
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopAttrib()
+
+    def summary(self):
+        elapsed = 0.0 if self.started is None else time.perf_counter() - self.started
+        frames = self.render_time.total
+        return {
+            'program': self.name,
+            'machine': {
+                'platform': platform.platform(),
+                'processor': platform.processor(),
+                'python': sys.version.split()[0],
+                'renderer': self.renderer,
+            },
+            'elapsed_s': elapsed,
+            'frames': frames,
+            'avg_fps': frames / elapsed if elapsed > 0 else 0.0,
+            'interval': self.interval.summary(),
+            'update': self.update_time.summary(),
+            'render': self.render_time.summary(),
+        }
+
+    def close(self):
+        """Write the JSON summary once, if anything was recorded."""
+        if self.closed or self.started is None or not self.json_path:
+            return
+        self.closed = True
+        self.write_json()
+
+    def write_json(self, path=None):
+        path = path or self.json_path
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"telemetry: wrote {path}")
@@ -0,0 +1,59 @@
+"""
+Cached GLUT bitmap text
+-----------------------
+Each distinct (font, text) string is compiled once into a display list and
+replayed with a single glCallList. Lists are kept in LRU order and the
+oldest are deleted once the cache is full.
+"""
+
+from collections import OrderedDict
+
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+
+def _font_key(font):
+    # GLUT fonts are ctypes pointers on some platforms, which do not hash
+    return getattr(font, 'value', font)
+
+class TextCache:
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.lists = OrderedDict()  # (font, text) -> display list id
+        self.compiled = 0
+
+    def _compile(self, font, text):
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        for ch in text:
+            glutBitmapCharacter(font, ord(ch))
+        glEndList()
+        self.compiled += 1
+        return list_id
+
+    def get(self, font, text):
+        key = (_font_key(font), text)
+        list_id = self.lists.get(key)
+        if list_id is not None:
+            self.lists.move_to_end(key)
+            return list_id
+        list_id = self._compile(font, text)
+        self.lists[key] = list_id
+        if len(self.lists) > self.capacity:
+            _, old_id = self.lists.popitem(last=False)
+            glDeleteLists(old_id, 1)
+        return list_id
+
+    def draw(self, x, y, text, font=GLUT_BITMAP_HELVETICA_18):
+        list_id = self.get(font, text)
+        glRasterPos2f(x, y)
+        glCallList(list_id)
+
+    def clear(self):
+        for list_id in self.lists.values():
+            glDeleteLists(list_id, 1)
+        self.lists.clear()
+
+text_cache = TextCache()
+
+def draw_text(x, y, text, font=GLUT_BITMAP_HELVETICA_18):
+    text_cache.draw(x, y, text, font)